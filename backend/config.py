@@ -7,4 +7,74 @@ ENV = os.getenv('ENV')
 
 PATH = Path(__file__).parent
 DATA_DIR = PATH / "data"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+# Process-wide embedding cache used at inference time (see backend/model/cache.py)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', 10000))
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv('EMBEDDING_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+EMBEDDING_CACHE_DTYPE = os.getenv('EMBEDDING_CACHE_DTYPE', 'float32')  # float32 or int8
+
+# Micro-batching of concurrent forecast requests (see backend/model/batching.py)
+BATCH_WINDOW_MS = float(os.getenv('BATCH_WINDOW_MS', 5))
+BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', 32))
+BATCH_MAX_QUEUE_DEPTH = int(os.getenv('BATCH_MAX_QUEUE_DEPTH', 256))
+
+# Dedicated inference thread pool with admission control (see backend/model/executor.py)
+# CPU thread budget of one serving process, applied by Models.load (see backend/model/budget.py):
+# INFERENCE_CPUS cores (0 = cores // SERVE_WORKERS) shared by INFERENCE_MAX_WORKERS concurrent inference jobs
+# (0 = min(4, cpus)), each with INFERENCE_THREADS_PER_JOB torch / LightGBM threads (0 = cpus // jobs)
+INFERENCE_CPUS = int(os.getenv('INFERENCE_CPUS', 0))
+INFERENCE_MAX_WORKERS = int(os.getenv('INFERENCE_MAX_WORKERS', 0))
+INFERENCE_THREADS_PER_JOB = int(os.getenv('INFERENCE_THREADS_PER_JOB', 0))
+INFERENCE_MAX_PENDING = int(os.getenv('INFERENCE_MAX_PENDING', 64))
+INFERENCE_RETRY_AFTER_SECONDS = int(os.getenv('INFERENCE_RETRY_AFTER_SECONDS', 1))
+
+# Preload-then-fork serving (python -m backend.serve): worker processes sharing the models loaded once by the master
+SERVE_WORKERS = int(os.getenv('SERVE_WORKERS', 1))
+SERVE_HOST = os.getenv('SERVE_HOST', '0.0.0.0')
+SERVE_PORT = int(os.getenv('SERVE_PORT', 8000))
+
+# Booster runtime used for serving: "lightgbm" or "packed" (pure NumPy, see backend/model/forest.py)
+MODEL_ENGINE = os.getenv('MODEL_ENGINE', 'lightgbm')
+
+# Curve-sparse forecasting: evaluate the boosters at this many ages and interpolate the rest (0 = every age)
+FORECAST_KNOTS = int(os.getenv('FORECAST_KNOTS', 0))
+
+# Texts per SentenceTransformer.encode batch at inference time
+ENCODE_BATCH_SIZE = int(os.getenv('ENCODE_BATCH_SIZE', 64))
+# Sentence encoder backend for serving (see backend/model/encoder.py): "torch", "int8" (dynamic int8
+# quantization), "onnx" or "onnx-int8" (ONNX Runtime, needs optimum[onnxruntime]); training always uses torch
+ENCODER_BACKEND = os.getenv('ENCODER_BACKEND', 'torch')
+# ONNX graph inside the model repo (empty = onnx/model.onnx, or onnx/model_quint8_avx2.onnx for onnx-int8)
+ENCODER_ONNX_FILE = os.getenv('ENCODER_ONNX_FILE', '')
+# Minimum 1st-percentile cosine similarity to the torch embeddings for `python -m backend.model.encoder` to pass
+ENCODER_MIN_COSINE = float(os.getenv('ENCODER_MIN_COSINE', 0.99))
+# Persistent training embeddings, one memory-mapped .npy per transformer (see backend/model/store.py)
+EMBEDDING_STORE_DIR = Path(os.getenv('EMBEDDING_STORE_DIR', DATA_DIR / "embeddings"))
+# Rows per server-side cursor fetch when loading the training data
+TRAIN_FETCH_CHUNK_SIZE = int(os.getenv('TRAIN_FETCH_CHUNK_SIZE', 10000))
+# Texts per encode batch when embedding the training corpus
+TRAIN_ENCODE_BATCH_SIZE = int(os.getenv('TRAIN_ENCODE_BATCH_SIZE', 256))
+
+# Parallel training: per-target fits in up to TRAIN_MAX_WORKERS processes (1 = one after another),
+# each with TRAIN_THREADS_PER_JOB LightGBM threads (0 = cores // workers)
+TRAIN_MAX_WORKERS = int(os.getenv('TRAIN_MAX_WORKERS', 1))
+TRAIN_THREADS_PER_JOB = int(os.getenv('TRAIN_THREADS_PER_JOB', 0))
+
+# Incremental retraining (train --incremental): trees added per run, minimum new rows, and the allowed
+# holdout RMSE increase over the last full retrain before falling back to a full retrain
+INCREMENTAL_ROUNDS = int(os.getenv('INCREMENTAL_ROUNDS', 50))
+INCREMENTAL_MIN_ROWS = int(os.getenv('INCREMENTAL_MIN_ROWS', 500))
+INCREMENTAL_MAX_DEGRADATION = float(os.getenv('INCREMENTAL_MAX_DEGRADATION', 0.05))
+
+# Training reports (evaluation plots, feature importance, SHAP) are opt-in and render in a background process;
+# SHAP runs on a stratified sample of this many test rows
+TRAIN_REPORT = os.getenv('TRAIN_REPORT', 'false').lower() in ('1', 'true', 'yes')
+SHAP_SAMPLE_SIZE = int(os.getenv('SHAP_SAMPLE_SIZE', 2000))
+
+# Cross-validation (python -m backend.model.models cv): fold fits run in up to CV_MAX_WORKERS processes
+# (0 = the thread budget's job count, min(4, cores); each worker holds a binned copy of the feature matrix);
+# after CV_MIN_FOLDS folds a setting is dropped once its RMSE is more than CV_PRUNE_MARGIN above the best
+CV_MAX_WORKERS = int(os.getenv('CV_MAX_WORKERS', 0))
+CV_MIN_FOLDS = int(os.getenv('CV_MIN_FOLDS', 2))
+CV_PRUNE_MARGIN = float(os.getenv('CV_PRUNE_MARGIN', 0.02))
@@ -1 +1,6 @@
-FREE_QUOTA = 30
\ No newline at end of file
+FREE_QUOTA = 30
+SWEEP_COST = 1
+SWEEP_MAX_POINTS = 40
+BATCH_FORECAST_MAX_TWEETS = 200
+BATCH_FORECAST_STREAM_THRESHOLD = 50
+BATCH_FORECAST_CHUNK_SIZE = 25
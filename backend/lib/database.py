@@ -64,6 +64,23 @@ class Database:
         except Exception as e:
             raise
 
+    def stream(self, sql: str, params: tuple = None, chunk_size: int = 10000, name: str = "stream"):
+        """Yield the rows of a query as lists of tuples, chunk_size rows at a time, through a named server-side cursor"""
+        # Named cursors only exist inside a transaction
+        self.conn.autocommit = False
+        try:
+            with self.conn.cursor(name=name) as cur:
+                cur.itersize = chunk_size
+                cur.execute(sql, params)
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+        finally:
+            self.conn.rollback()
+            self.conn.autocommit = True
+
     def close(self):
         if hasattr(self, 'conn'):
             self.conn.close()
@@ -84,6 +101,14 @@ def db_query(sql: str, params: tuple = None) -> list:
     db.close()
     return res
 
+def db_stream(sql: str, params: tuple = None, chunk_size: int = 10000, name: str = "stream"):
+    """Stream a large read in chunks of rows (tuples in SELECT column order) without loading the whole result"""
+    db = Database()
+    try:
+        yield from db.stream(sql, params, chunk_size, name)
+    finally:
+        db.close()
+
 def db_query_one(sql: str, params: tuple = None) -> dict:
     db = Database()
     res = db.query_one(sql, params)
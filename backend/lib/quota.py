@@ -114,6 +114,19 @@ class QuotaService:
             WHERE id = %s
         """, (cost, quota_check['quota']['id']))
     
+    @staticmethod
+    def refund_prediction(user_id: int, cost: int = 1) -> None:
+        """
+        Give back predictions that were charged but never delivered
+        (e.g. the unscored rest of a streamed batch).
+        """
+        quota = QuotaService.get_user_current_quota(user_id)
+        db_execute("""
+            UPDATE quota_usage
+            SET predictions_used = GREATEST(predictions_used - %s, 0), updated_at = NOW()
+            WHERE id = %s
+        """, (cost, quota['id']))
+    
     @staticmethod
     def get_user_stats(user_id: int) -> Dict[str, Any]:
         """Get usage statistics for a user using a single efficient query"""
@@ -1,7 +1,10 @@
 import os
 import sys
 
-from backend.constants import FREE_QUOTA
+from backend.constants import (
+    FREE_QUOTA, SWEEP_COST, SWEEP_MAX_POINTS,
+    BATCH_FORECAST_MAX_TWEETS, BATCH_FORECAST_STREAM_THRESHOLD, BATCH_FORECAST_CHUNK_SIZE
+)
 from backend.generator import TweetGenerator
 from backend.lib.stripe_service import StripeService
 from backend.utils import track_event
@@ -11,6 +14,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi import FastAPI, HTTPException, Request, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from backend.lib.database import db_query, db_execute, db_query_one
 import logging
 import httpx
@@ -19,6 +24,10 @@ from backend.lib.auth import Auth
 from backend.lib.quota import QuotaService
 from pydantic import BaseModel
 from backend.model.models import Models
+from backend.model.batching import InferenceBatcher
+from backend.model.executor import InferenceExecutor, InferenceQueueFull
+from backend.model.cache import EMBEDDING_CACHE
+from backend.serve import memory_stats
 from backend.config import DATA_DIR
 import pandas as pd
 import os
@@ -36,6 +45,8 @@ app = FastAPI()
 # MODEL = Model.load(DATA_DIR / "model.pkl")
 MODEL = Models.load(["views", "likes", "retweets", "comments"])
 GENERATOR = TweetGenerator()
+INFERENCE_EXECUTOR = InferenceExecutor(max_workers=MODEL.thread_budget["executor_workers"])
+BATCHER = InferenceBatcher(MODEL, executor=INFERENCE_EXECUTOR)
 
 # Configure CORS
 app.add_middleware(
@@ -47,6 +58,15 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+@app.exception_handler(InferenceQueueFull)
+async def inference_queue_full_handler(request: Request, exc: InferenceQueueFull):
+    """Shed load when inference is saturated instead of queueing without bound"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Configure Resend API
 resend.api_key = os.getenv('RESEND_API_KEY')
 
@@ -63,6 +83,14 @@ class TweetPredictionRequest(BaseModel):
     author_followers_count: int
     is_blue_verified: bool
 
+class TweetSweepRequest(BaseModel):
+    text: str
+    author_followers_counts: list[int]
+    is_blue_verified: list[bool] = [False, True]
+
+class TweetBatchRequest(BaseModel):
+    tweets: list[TweetPredictionRequest]
+
 class TweetVariationRequest(BaseModel):
     tweets: list[TweetPredictionRequest]
     custom_instructions: str | None = None
@@ -126,7 +154,7 @@ async def get_tweet_variation(request: Request, data: TweetVariationRequest, cur
             for tweet in variations
         ]
 
-        predictions = MODEL.predict_bulk(variations, [0.1] + list(range(1, 25)))
+        predictions = await INFERENCE_EXECUTOR.run(MODEL.predict_bulk, variations, [0.1] + list(range(1, 25)))
         QuotaService.record_prediction(current_user['id'], cost=COST_PER_VARIATION)
 
         # Track the variation generation
@@ -164,8 +192,8 @@ async def get_tweet_forecast(request: Request, data: TweetPredictionRequest, cur
         if not text or author_followers_count <= 0:
             return {"prediction": 0, "error": "Invalid input data"}
         
-        # Make the prediction first
-        prediction = MODEL.predict({
+        # Make the prediction first (coalesced with concurrent forecasts)
+        prediction = await BATCHER.predict({
             "text": text, 
             "author_followers_count": author_followers_count,
             "is_blue_verified": 1 if is_blue_verified else 0  # Convert to int for the ML model
@@ -195,10 +223,151 @@ async def get_tweet_forecast(request: Request, data: TweetPredictionRequest, cur
         }
     except HTTPException:
         raise
+    except InferenceQueueFull:
+        raise
     except Exception as e:
         logger.error(f"Error in get_tweet_forecast: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/tweet-forecast/batch")
+async def get_tweet_forecast_batch(request: Request, data: TweetBatchRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Forecast many drafts in one call.
+
+    Quota is checked and charged once for the whole batch (one prediction per
+    draft). Results come back in input order; large batches (or clients that
+    accept application/x-ndjson) get one NDJSON line per draft as chunks
+    finish. A stream that fails midway refunds the drafts it never scored.
+    """
+    try:
+        n_tweets = len(data.tweets)
+        if n_tweets == 0 or n_tweets > BATCH_FORECAST_MAX_TWEETS:
+            raise HTTPException(status_code=400, detail=f"Batch must contain 1 to {BATCH_FORECAST_MAX_TWEETS} tweets")
+        if any(not tweet.text or tweet.author_followers_count <= 0 for tweet in data.tweets):
+            raise HTTPException(status_code=400, detail="Invalid input data")
+
+        quota_check = QuotaService.can_make_prediction(current_user['id'], cost=n_tweets)
+        if not quota_check['allowed']:
+            raise HTTPException(status_code=403, detail=quota_check['reason'])
+
+        tweets = [
+            {
+                "text": tweet.text,
+                "author_followers_count": tweet.author_followers_count,
+                "is_blue_verified": 1 if tweet.is_blue_verified else 0  # Convert to int for the ML model
+            }
+            for tweet in data.tweets
+        ]
+        age_hours = [0.1] + list(range(1, 25))
+        quota_remaining = quota_check['remaining'] - n_tweets
+
+        stream = n_tweets > BATCH_FORECAST_STREAM_THRESHOLD or "application/x-ndjson" in request.headers.get("accept", "")
+        if not stream:
+            predictions = await INFERENCE_EXECUTOR.run(MODEL.predict_bulk, tweets, age_hours)
+        else:
+            # Score the first chunk before the status code is sent, so a saturated
+            # executor still answers 503 and nothing is charged
+            first_results = await INFERENCE_EXECUTOR.run(MODEL.predict_bulk, tweets[:BATCH_FORECAST_CHUNK_SIZE], age_hours)
+        QuotaService.record_prediction(user_id=current_user['id'], cost=n_tweets)
+
+        await track_event(request, "Tweet Forecast Batch Generated", {
+            "batch_size": n_tweets,
+            "streamed": stream,
+            "user_id": current_user['id'],
+            "quota_remaining": quota_remaining
+        })
+
+        if not stream:
+            return {
+                "age_hours": age_hours,
+                "predictions": predictions,
+                "quota_remaining": quota_remaining
+            }
+
+        async def ndjson_lines():
+            results = first_results
+            for start in range(0, n_tweets, BATCH_FORECAST_CHUNK_SIZE):
+                if start > 0:
+                    try:
+                        results = await INFERENCE_EXECUTOR.run(MODEL.predict_bulk, tweets[start:start + BATCH_FORECAST_CHUNK_SIZE], age_hours)
+                    except Exception as e:
+                        logger.error(f"Error in get_tweet_forecast_batch stream: {str(e)}")
+                        # Drafts from here on were charged but never scored
+                        refunded = n_tweets - start
+                        try:
+                            await run_in_threadpool(QuotaService.refund_prediction, current_user['id'], cost=refunded)
+                        except Exception as refund_error:
+                            logger.error(f"Quota refund failed for user {current_user['id']}: {str(refund_error)}")
+                            refunded = 0
+                        yield json.dumps({"error": "Forecast failed", "tweet_idx": start, "quota_refunded": refunded}) + "\n"
+                        return
+                for result in results:
+                    result["tweet_idx"] += start
+                    result["age_hours"] = age_hours
+                    yield json.dumps(result) + "\n"
+
+        return StreamingResponse(
+            ndjson_lines(),
+            media_type="application/x-ndjson",
+            headers={"X-Quota-Remaining": str(quota_remaining)}
+        )
+    except (HTTPException, InferenceQueueFull):
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_tweet_forecast_batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/tweet-forecast/sweep")
+async def get_tweet_forecast_sweep(request: Request, data: TweetSweepRequest, current_user: dict = Depends(get_current_user)):
+    """Forecast one draft across a grid of follower counts and verification states"""
+    try:
+        quota_check = QuotaService.can_make_prediction(current_user['id'], cost=SWEEP_COST)
+        if not quota_check['allowed']:
+            raise HTTPException(status_code=403, detail=quota_check['reason'])
+
+        followers_counts = list(dict.fromkeys(data.author_followers_counts))
+        verified_values = list(dict.fromkeys(1 if v else 0 for v in data.is_blue_verified))
+        if not data.text or not followers_counts or not verified_values or min(followers_counts) <= 0:
+            raise HTTPException(status_code=400, detail="Invalid input data")
+        if len(followers_counts) * len(verified_values) > SWEEP_MAX_POINTS:
+            raise HTTPException(status_code=400, detail=f"Sweep is limited to {SWEEP_MAX_POINTS} combinations")
+
+        age_hours = [0.1] + list(range(1, 25))
+        curves = await INFERENCE_EXECUTOR.run(MODEL.predict_sweep, data.text, followers_counts, verified_values, age_hours)
+
+        QuotaService.record_prediction(user_id=current_user['id'], cost=SWEEP_COST)
+
+        await track_event(request, "Tweet Forecast Sweep Generated", {
+            "tweet_length": len(data.text),
+            "sweep_points": len(curves),
+            "user_id": current_user['id'],
+            "quota_remaining": quota_check['remaining'] - SWEEP_COST
+        })
+
+        return {
+            "age_hours": age_hours,
+            "curves": curves,
+            "quota_remaining": quota_check['remaining'] - SWEEP_COST
+        }
+    except (HTTPException, InferenceQueueFull):
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_tweet_forecast_sweep: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/admin/inference-stats")
+async def get_inference_stats(current_user: dict = Depends(get_current_user)):
+    """Micro-batching, executor, embedding cache and worker memory statistics (admins only)"""
+    if not current_user.get('is_admin'):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return {
+        "batching": BATCHER.stats(),
+        "executor": INFERENCE_EXECUTOR.stats(),
+        "embedding_cache": EMBEDDING_CACHE.stats(),
+        "worker": {"pid": os.getpid(), **memory_stats()},
+        "thread_budget": MODEL.thread_budget
+    }
+
 @app.get("/user/quota")
 async def get_user_quota(
     current_user: dict = Depends(get_current_user),
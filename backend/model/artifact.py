@@ -0,0 +1,182 @@
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+from datetime import datetime, timezone
+
+import numpy as np
+
+JOINT_ARTIFACT_NAME = "models.pkl"
+JOINT_ARTIFACT_FORMAT = "tweet-optimize/models"
+JOINT_ARTIFACT_VERSION = 1
+
+PACKED_ARTIFACT_NAME = "models.bin"
+PACKED_ARTIFACT_FORMAT = "tweet-optimize/packed-models"
+PACKED_ARTIFACT_MAGIC = b"TWOPTMDL"
+PACKED_ARTIFACT_VERSION = 1
+PACKED_ARTIFACT_ALIGNMENT = 64
+# magic, format version, header length
+_PACKED_PREFIX = struct.Struct("<8sII")
+
+# Model.to_dict() keys shared by every target; stored once in the joint artifact
+FEATURE_SPEC_KEYS = ("transformer_model_name", "num_features", "cat_features", "text_features", "text_feat", "embedding_size")
+
+
+class ArtifactError(Exception):
+    """Raised when a model artifact is missing, corrupt or of an unsupported version."""
+
+
+def save_joint_artifact(path, model_dicts: dict, metadata: dict = None) -> dict:
+    """
+    Write all targets into one artifact with a shared feature spec.
+
+    The file holds a small header (format, version, sha256 of the payload)
+    and the pickled payload bytes, so integrity is checked before the
+    boosters are unpickled.
+
+    Args:
+        path: destination file
+        model_dicts: target name -> Model.to_dict()
+        metadata: extra JSON-serializable header fields (e.g. the training watermark)
+    """
+    if not model_dicts:
+        raise ArtifactError("No models to save")
+    first = next(iter(model_dicts.values()))
+    feature_spec = {key: first[key] for key in FEATURE_SPEC_KEYS}
+    targets = {}
+    for name, model_data in model_dicts.items():
+        if any(model_data[key] != feature_spec[key] for key in FEATURE_SPEC_KEYS):
+            raise ArtifactError(f"Target {name} does not share the feature spec of the other targets")
+        targets[name] = {key: value for key, value in model_data.items() if key not in FEATURE_SPEC_KEYS}
+
+    payload = pickle.dumps({"feature_spec": feature_spec, "targets": targets}, protocol=pickle.HIGHEST_PROTOCOL)
+    header = {
+        **(metadata or {}),
+        "format": JOINT_ARTIFACT_FORMAT,
+        "version": JOINT_ARTIFACT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "targets": list(targets),
+        "sha256": hashlib.sha256(payload).hexdigest()
+    }
+
+    # Write to a temporary file and rename so readers never see a partial artifact
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"header": header, "payload": payload}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return header
+
+
+def load_joint_artifact(path) -> tuple[dict, dict]:
+    """
+    Read a joint artifact in one go.
+
+    Returns (header, model_dicts) where model_dicts maps target name to the
+    same dict Model.to_dict() produced.
+    """
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+
+    header = data.get("header", {}) if isinstance(data, dict) else {}
+    if header.get("format") != JOINT_ARTIFACT_FORMAT:
+        raise ArtifactError(f"{path} is not a joint model artifact")
+    if header.get("version") != JOINT_ARTIFACT_VERSION:
+        raise ArtifactError(f"Unsupported artifact version {header.get('version')}, expected {JOINT_ARTIFACT_VERSION}")
+    if hashlib.sha256(data["payload"]).hexdigest() != header["sha256"]:
+        raise ArtifactError(f"Checksum mismatch for {path}")
+
+    payload = pickle.loads(data["payload"])
+    model_dicts = {
+        name: {**payload["feature_spec"], **target_data}
+        for name, target_data in payload["targets"].items()
+    }
+    return header, model_dicts
+
+
+def _align(offset: int) -> int:
+    return -(-offset // PACKED_ARTIFACT_ALIGNMENT) * PACKED_ARTIFACT_ALIGNMENT
+
+
+def save_packed_artifact(path, header: dict, arrays: dict) -> dict:
+    """
+    Write a pickle-free artifact: JSON header followed by raw little-endian arrays.
+
+    Layout: magic | version (u32) | header length (u32) | JSON header, then every
+    array at a 64-byte aligned offset of the data section. The header records
+    dtype, shape and offset of each array plus a sha256 of the data section.
+
+    Args:
+        path: destination file
+        header: JSON-serializable metadata (feature spec, targets, ...)
+        arrays: name -> numpy array
+    """
+    layout = {}
+    blobs = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array, dtype=np.asarray(array).dtype.newbyteorder("<"))
+        offset = _align(offset)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        blobs.append((offset, array))
+        offset += array.nbytes
+    data = bytearray(offset)
+    for start, array in blobs:
+        data[start:start + array.nbytes] = array.tobytes()
+
+    header = {
+        **header,
+        "format": PACKED_ARTIFACT_FORMAT,
+        "version": PACKED_ARTIFACT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "arrays": layout,
+        "sha256": hashlib.sha256(data).hexdigest()
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix = _PACKED_PREFIX.pack(PACKED_ARTIFACT_MAGIC, PACKED_ARTIFACT_VERSION, len(header_bytes))
+    data_start = _align(len(prefix) + len(header_bytes))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix)
+        f.write(header_bytes)
+        f.write(b"\0" * (data_start - len(prefix) - len(header_bytes)))
+        f.write(data)
+    os.replace(tmp_path, path)
+    return header
+
+
+def open_packed_artifact(path, verify: bool = False) -> tuple[dict, dict]:
+    """
+    Memory-map a packed artifact.
+
+    Returns (header, arrays) where arrays are read-only views into the shared
+    mapping, so every process that opens the file shares the same physical
+    pages. With verify=True the data section is checksummed, which touches
+    every page.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, header_length = _PACKED_PREFIX.unpack_from(buffer, 0)
+    if magic != PACKED_ARTIFACT_MAGIC:
+        raise ArtifactError(f"{path} is not a packed model artifact")
+    if version != PACKED_ARTIFACT_VERSION:
+        raise ArtifactError(f"Unsupported packed artifact version {version}, expected {PACKED_ARTIFACT_VERSION}")
+    header_end = _PACKED_PREFIX.size + header_length
+    header = json.loads(bytes(buffer[_PACKED_PREFIX.size:header_end]).decode("utf-8"))
+    # Packed artifacts written before the format had its own name carry the joint one
+    if header.get("format") not in (PACKED_ARTIFACT_FORMAT, JOINT_ARTIFACT_FORMAT):
+        raise ArtifactError(f"Unsupported packed artifact format {header.get('format')!r}, expected {PACKED_ARTIFACT_FORMAT}")
+    data_start = _align(header_end)
+
+    if verify and hashlib.sha256(memoryview(buffer)[data_start:]).hexdigest() != header["sha256"]:
+        raise ArtifactError(f"Checksum mismatch for {path}")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + spec["offset"]).reshape(spec["shape"])
+    return header, arrays
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from collections import Counter
+
+from backend.config import BATCH_WINDOW_MS, BATCH_MAX_SIZE, BATCH_MAX_QUEUE_DEPTH
+from backend.model.executor import InferenceQueueFull
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBatcher:
+    """
+    Coalesces concurrent forecast requests into micro-batches.
+
+    Requests wait in a bounded queue. The dispatcher takes the first waiting
+    request, keeps collecting for up to `window_ms` or until `max_batch_size`
+    requests are gathered, runs one `Models.predict_many` call per distinct
+    age grid (one encode, one booster call per target) and resolves every
+    waiting request with its own result.
+
+    Batches run on `executor` (an InferenceExecutor) when given, otherwise on
+    the event loop's default executor.
+    """
+
+    def __init__(self, models, window_ms: float = BATCH_WINDOW_MS, max_batch_size: int = BATCH_MAX_SIZE,
+                 max_queue_depth: int = BATCH_MAX_QUEUE_DEPTH, executor=None):
+        self.models = models
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_queue_depth = max_queue_depth
+        self.executor = executor
+        self._queue = None
+        self._worker = None
+        self._tasks = set()
+        self.batch_sizes = Counter()
+        self.rejected = 0
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = self._queue or asyncio.Queue(maxsize=self.max_queue_depth)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def predict(self, data: dict, age_hours: list[int]) -> dict:
+        """Queue one forecast and wait for its batched result."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((data, list(age_hours), future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise InferenceQueueFull("Inference batch queue is full")
+        return await future
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _dispatch(self, items: list, age_hours: list):
+        args = (self.models.predict_many, [item[0] for item in items], age_hours)
+        try:
+            if self.executor is not None:
+                results = await self.executor.run(*args)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(None, *args)
+        except Exception as e:
+            if not isinstance(e, InferenceQueueFull):
+                logger.error(f"Batched inference failed: {str(e)}")
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self):
+        # One batch per executor worker may run at a time
+        slots = asyncio.Semaphore(self.executor.max_workers if self.executor is not None else 1)
+        while True:
+            batch = await self._collect()
+            self.batch_sizes[len(batch)] += 1
+
+            # Requests with different age grids cannot share a feature matrix
+            groups = {}
+            for item in batch:
+                groups.setdefault(tuple(item[1]), []).append(item)
+
+            for age_hours, items in groups.items():
+                await slots.acquire()
+                task = asyncio.get_running_loop().create_task(self._dispatch(items, list(age_hours)))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                task.add_done_callback(lambda _: slots.release())
+
+    def stats(self) -> dict:
+        batches = sum(self.batch_sizes.values())
+        items = sum(size * count for size, count in self.batch_sizes.items())
+        return {
+            "batches": batches,
+            "requests": items,
+            "mean_batch_size": items / batches if batches else 0.0,
+            "max_batch_size_seen": max(self.batch_sizes, default=0),
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "rejected": self.rejected,
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "max_queue_depth": self.max_queue_depth
+        }
@@ -0,0 +1,237 @@
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backend.model.models import Models
+from backend.model.budget import available_cpus, thread_budget
+from backend.model.executor import InferenceExecutor
+from backend.model.utils import preprocess_text, preprocess_texts, stopwords
+
+TARGETS = ["views", "likes", "retweets", "comments"]
+AGE_HOURS = [0.1] + list(range(1, 25))
+
+
+def timeit(fn, repeat: int = 5) -> dict:
+    """Run fn `repeat` times and return the median and best wall-clock time in ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": float(np.median(timings)), "best_ms": float(np.min(timings))}
+
+
+def make_tweets(n: int, seed: int = 42) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    words = ["launch", "today", "new", "thread", "build", "ship", "python", "model", "forecast", "growth"]
+    return [
+        {
+            "text": " ".join(rng.choice(words, size=rng.integers(3, 12))) + f" #{i}",
+            "author_followers_count": int(rng.integers(10, 100000)),
+            "is_blue_verified": int(rng.integers(0, 2))
+        }
+        for i in range(n)
+    ]
+
+
+def groupby_result_assembly(models: Models, data: list[dict], age_hours: list) -> list[dict]:
+    """
+    Result assembly of the former predict_bulk (long DataFrame grouped back
+    into one dict per tweet) on top of the current feature path, so the
+    comparison isolates the assembly step. Groups come out sorted by
+    (tweet_idx, text), not necessarily in input order.
+    """
+    n_ages = len(age_hours)
+    columns = models._grid_columns(data, age_hours)
+    target_predictions = models._predict_targets(models.build_features(columns))
+    in_data = pd.DataFrame({
+        "tweet_idx": np.repeat(np.arange(len(data)), n_ages),
+        "text": columns["text"]
+    })
+    for target in models.targets:
+        in_data[target] = target_predictions[target]
+
+    out = []
+    for (tweet_idx, text), values in in_data.groupby(["tweet_idx", "text"]):
+        tmp = {"tweet_idx": int(tweet_idx), "text": text}
+        for target in models.targets:
+            tmp[target] = [float(v) for v in values[target].tolist()]
+        out.append(tmp)
+    return out
+
+
+def bench_bulk(models: Models, sizes=(10, 100, 1000), repeat: int = 5) -> list[dict]:
+    """
+    Compare predict_bulk against the former groupby result assembly.
+
+    Embeddings are warmed up first and both paths build features and call
+    the boosters the same way, so the difference is the result assembly.
+    """
+    results = []
+    for n in sizes:
+        data = make_tweets(n)
+        models.predict_bulk(data, AGE_HOURS)
+        results.append({
+            "n_tweets": n,
+            "groupby": timeit(lambda: groupby_result_assembly(models, data, AGE_HOURS), repeat),
+            "array": timeit(lambda: models.predict_bulk(data, AGE_HOURS), repeat)
+        })
+    return results
+
+
+def legacy_preprocess_text(text):
+    """The former multi-pass preprocess_text."""
+    if text is None:
+        return ""
+    text = text.lower()
+    text = re.sub(r'\W', ' ', text)
+    text = re.sub(r'\d', ' ', text)
+    text = re.sub(r'\n', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    tokens = text.split()
+    tokens = [word for word in tokens if word not in stopwords]
+    return ' '.join(tokens)
+
+
+def bench_preprocess(sizes=(1000, 10000, 100000), repeat: int = 5) -> list[dict]:
+    """Compare the multi-pass normalizer with the single-pass one and its list variant."""
+    results = []
+    for n in sizes:
+        # Scraped tweets repeat a lot (one row per observation), so reuse texts
+        texts = [tweet["text"] for tweet in make_tweets(max(n // 4, 1))] * 4
+        texts = texts[:n]
+        results.append({
+            "n_texts": n,
+            "legacy": timeit(lambda: [legacy_preprocess_text(text) for text in texts], repeat),
+            "single_pass": timeit(lambda: [preprocess_text(text) for text in texts], repeat),
+            "vectorized": timeit(lambda: preprocess_texts(texts), repeat)
+        })
+    return results
+
+
+def _letters(i: int) -> str:
+    # Distinct alphabetic token per request, so preprocessing keeps it and the embedding cache never hits
+    word = ""
+    while True:
+        word = chr(ord("a") + i % 26) + word
+        i = i // 26 - 1
+        if i < 0:
+            return "zq" + word
+
+
+def _closed_loop(models: Models, budget: dict, clients: int, n_requests: int, offset: int) -> dict:
+    """`clients` threads each send single-tweet forecasts back to back through an InferenceExecutor."""
+    models.use_thread_budget(budget)
+    executor = InferenceExecutor(max_workers=budget["executor_workers"], max_pending=clients)
+    tweets = make_tweets(n_requests, seed=offset)
+    for i, tweet in enumerate(tweets):
+        tweet["text"] += " " + _letters(offset + i)
+    models.predict(make_tweets(1)[0], AGE_HOURS)  # warm-up
+
+    def client(k: int) -> list[float]:
+        latencies = []
+        for tweet in tweets[k::clients]:
+            start = time.perf_counter()
+            executor.submit(models.predict, tweet, AGE_HOURS).result()
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = [value for values in pool.map(client, range(clients)) for value in values]
+    wall = time.perf_counter() - start
+    executor.shutdown()
+    return {"latencies": latencies, "wall": wall}
+
+
+def _run_workers(models: Models, budget: dict, workers: int, clients: int, n_requests: int) -> dict:
+    """Fork `workers` processes from the loaded models (like backend.serve) and run the closed loop in each."""
+    per_worker = max(n_requests // workers, 1)
+    clients_per_worker = max(clients // workers, 1)
+    pipes = []
+    for w in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            code = 0
+            try:
+                result = _closed_loop(models, budget, clients_per_worker, per_worker, offset=(w + 1) * 1000003)
+                with os.fdopen(write_fd, "w") as f:
+                    json.dump(result, f)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            os._exit(code)
+        os.close(write_fd)
+        pipes.append((pid, read_fd))
+
+    results = []
+    for pid, read_fd in pipes:
+        with os.fdopen(read_fd) as f:
+            output = f.read()
+        if os.waitpid(pid, 0)[1] != 0:
+            raise RuntimeError(f"Benchmark worker {pid} failed")
+        results.append(json.loads(output))
+    latencies = np.concatenate([result["latencies"] for result in results])
+    return {
+        "throughput_rps": len(latencies) / max(result["wall"] for result in results),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99))
+    }
+
+
+def bench_threads(models: Models, workers=(1, 2, 4), clients=(1, 4, 16), n_requests: int = 200) -> list[dict]:
+    """
+    Throughput and latency of single-tweet forecasts under the thread budget vs the libraries' defaults.
+
+    For each worker count the loaded models are forked into that many
+    processes (as backend.serve does) and `clients` concurrent closed-loop
+    clients are spread over them. "budget" is thread_budget(workers);
+    "default" is the former setup: every process uses all cores for torch and
+    LightGBM with min(4, cores) concurrent jobs. Every request has a new text,
+    so the encoder runs each time.
+    """
+    cpus = available_cpus()
+    results = []
+    for n_workers in workers:
+        settings = {
+            "budget": thread_budget(workers=n_workers),
+            "default": {"workers": n_workers, "cpus": cpus, "executor_workers": min(4, cpus), "torch_threads": cpus, "lightgbm_threads": 0}
+        }
+        for name, budget in settings.items():
+            for n_clients in clients:
+                row = {"workers": n_workers, "setting": name, "clients": n_clients,
+                       "jobs_x_threads": f"{budget['executor_workers']}x{budget['torch_threads']}"}
+                row.update(_run_workers(models, budget, n_workers, n_clients, n_requests))
+                results.append(row)
+                print(", ".join(f"{key}={round(value, 1) if isinstance(value, float) else value}" for key, value in row.items()), flush=True)
+    return results
+
+
+def print_results(results: list[dict]):
+    for row in results:
+        timings = {name: value for name, value in row.items() if isinstance(value, dict)}
+        label = ", ".join(f"{key}={value}" for key, value in row.items() if key not in timings)
+        print(label + ": " + ", ".join(f"{name} {t['median_ms']:.1f} ms" for name, t in timings.items()))
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "bulk"
+    if command == "bulk":
+        print_results(bench_bulk(Models.load(TARGETS)))
+    elif command == "preprocess":
+        print_results(bench_preprocess())
+    elif command == "threads":
+        # Load once under the single-process budget (not SERVE_WORKERS'); each run applies its own after forking
+        bench_threads(Models.load(TARGETS, engine="lightgbm", budget=thread_budget(workers=1)))
+    else:
+        print(f"Unknown benchmark: {command}")
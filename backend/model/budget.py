@@ -0,0 +1,39 @@
+import os
+import sys
+
+from backend.config import SERVE_WORKERS, INFERENCE_CPUS, INFERENCE_MAX_WORKERS, INFERENCE_THREADS_PER_JOB
+
+
+def available_cpus() -> int:
+    """Cores this process may run on (respects CPU affinity, e.g. a container cpuset)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def thread_budget(workers: int = SERVE_WORKERS, cpus: int = INFERENCE_CPUS, jobs: int = INFERENCE_MAX_WORKERS,
+                  threads_per_job: int = INFERENCE_THREADS_PER_JOB) -> dict:
+    """
+    CPU thread budget of one serving process.
+
+    torch and LightGBM each default to one thread per core, per call. With
+    several worker processes and concurrent requests that multiplies into
+    far more runnable threads than cores. By default the cores are split
+    evenly between the `workers` processes, each process runs up to
+    min(4, cpus) inference jobs at once, and every job's encoder and booster
+    calls get cpus // jobs threads, so workers x jobs x threads stays at the
+    core count. Non-zero arguments override the derived values.
+
+    Returns {"workers", "cpus", "executor_workers", "torch_threads", "lightgbm_threads"}.
+    """
+    cpus = cpus or max(1, available_cpus() // max(workers, 1))
+    jobs = jobs or min(4, cpus)
+    threads = threads_per_job or max(1, cpus // jobs)
+    return {"workers": workers, "cpus": cpus, "executor_workers": jobs, "torch_threads": threads, "lightgbm_threads": threads}
+
+
+def apply_torch_threads(n_threads: int):
+    """Set torch's process-wide intra-op thread count; a no-op when torch is not loaded (e.g. ONNX encoder)."""
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(n_threads)
@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.config import EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_CACHE_MAX_BYTES, EMBEDDING_CACHE_DTYPE
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU cache of sentence embeddings keyed by preprocessed text.
+
+    Entries are evicted least-recently-used first once either the entry cap
+    or the byte cap is exceeded. Embeddings are stored as float32, or as int8
+    with a per-vector scale when dtype="int8" (4x smaller, small precision loss).
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, dtype: str = "float32"):
+        if dtype not in ("float32", "int8"):
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.dtype = dtype
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _pack(self, embedding: np.ndarray):
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if self.dtype == "int8":
+            scale = float(np.abs(embedding).max()) / 127.0 or 1.0
+            quantized = np.round(embedding / scale).astype(np.int8)
+            return (quantized, np.float32(scale)), quantized.nbytes + 4
+        embedding = embedding.copy()
+        return (embedding, None), embedding.nbytes
+
+    @staticmethod
+    def _unpack(entry) -> np.ndarray:
+        values, scale = entry
+        if scale is None:
+            return values
+        return values.astype(np.float32) * scale
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def get(self, key):
+        """Return the cached embedding for key, or None on a miss."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._unpack(item[0])
+
+    def put(self, key, embedding) -> np.ndarray:
+        """Store an embedding; returns it as a later get() will (dequantized with int8 storage)."""
+        with self._lock:
+            entry, size = self._pack(embedding)
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (entry, size)
+            self._bytes += size
+            self._evict()
+            return self._unpack(entry)
+
+    def encode(self, transformer, texts: list[str], namespace: str = "", batch_size: int = None) -> np.ndarray:
+        """
+        Encode texts through the cache.
+
+        Cached texts are served from memory, the misses are encoded by the
+        transformer in a single call and stored. Misses return the stored
+        value, so a text gets the same embedding whether or not it was cached.
+
+        Args:
+            transformer: object with an encode(list[str]) method
+            texts: preprocessed texts
+            namespace: transformer name, so different encoders never share entries
+            batch_size: encode batch size for the misses (transformer default if None)
+        """
+        embeddings = [self.get((namespace, text)) for text in texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            kwargs = {"batch_size": batch_size} if batch_size else {}
+            encoded = np.asarray(transformer.encode([texts[i] for i in missing], **kwargs), dtype=np.float32)
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = self.put((namespace, texts[i]), embedding)
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(embeddings)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "dtype": self.dtype
+            }
+
+
+# Shared by every Model in the process
+EMBEDDING_CACHE = EmbeddingCache(
+    max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+    max_bytes=EMBEDDING_CACHE_MAX_BYTES,
+    dtype=EMBEDDING_CACHE_DTYPE
+)
@@ -0,0 +1,59 @@
+import numpy as np
+
+
+def select_knots(age_hours: list, n_knots: int) -> list:
+    """
+    Pick n_knots ages from the grid, evenly spaced in log1p(age).
+
+    The first and last age are always included, so interpolation never
+    extrapolates. Returns the full grid when n_knots covers it, otherwise
+    exactly max(n_knots, 2) ages in grid order.
+    """
+    ages = np.asarray(age_hours, dtype=np.float64)
+    if n_knots >= len(ages):
+        return list(age_hours)
+    n_knots = max(n_knots, 2)
+    log_ages = np.log1p(ages)
+    targets = np.linspace(log_ages.min(), log_ages.max(), n_knots)
+    picks = {int(np.abs(log_ages - t).argmin()) for t in targets}
+    # On short or uneven grids several targets snap to the same age; fill up with
+    # the ages farthest (in log1p) from every knot picked so far
+    while len(picks) < n_knots:
+        chosen = np.fromiter(picks, dtype=np.int64)
+        distance = np.abs(log_ages[:, None] - log_ages[chosen][None, :]).min(axis=1)
+        distance[chosen] = -np.inf
+        picks.add(int(distance.argmax()))
+    return [age_hours[i] for i in sorted(picks)]
+
+
+def interpolate_curves(knot_ages: list, knot_values: np.ndarray, age_hours: list) -> np.ndarray:
+    """
+    Fill curves on the full age grid from their values at the knot ages.
+
+    Interpolates log1p(value) over log1p(age) with a PCHIP spline, which keeps
+    monotone knot values monotone and never overshoots between knots.
+
+    Args:
+        knot_ages: ages the boosters were evaluated at (sorted, unique)
+        knot_values: (..., n_knots) predictions at those ages
+        age_hours: ages to return
+    """
+    from scipy.interpolate import PchipInterpolator
+
+    x = np.log1p(np.asarray(knot_ages, dtype=np.float64))
+    y = np.log1p(np.maximum(np.asarray(knot_values, dtype=np.float64), 0.0))
+    spline = PchipInterpolator(x, y, axis=-1, extrapolate=True)
+    return np.expm1(spline(np.log1p(np.asarray(age_hours, dtype=np.float64))))
+
+
+def curve_error_stats(dense: np.ndarray, sparse: np.ndarray) -> dict:
+    """Relative error of sparse curves against dense ones, both (n_curves, n_ages)."""
+    rel_error = np.abs(sparse - dense) / np.maximum(np.abs(dense), 1.0)
+    final_error = rel_error[:, -1]
+    return {
+        "mean_rel_error": float(rel_error.mean()),
+        "p95_rel_error": float(np.percentile(rel_error, 95)),
+        "max_rel_error": float(rel_error.max()),
+        "p95_final_rel_error": float(np.percentile(final_error, 95)),
+        "non_monotone_curves": int(np.any(np.diff(sparse, axis=1) < -1e-9, axis=1).sum())
+    }
@@ -0,0 +1,112 @@
+import numpy as np
+
+# Hyperparameter settings compared by `python -m backend.model.models cv`, as overrides of Model.training_params
+DEFAULT_SETTINGS = [
+    {},
+    {"num_leaves": 15},
+    {"num_leaves": 63},
+    {"learning_rate": 0.1},
+    {"min_child_samples": 50},
+]
+
+
+def _summary(folds: list[dict]) -> dict:
+    summary = {}
+    for metric in ("rmse", "mae", "r2"):
+        values = np.array([fold[metric] for fold in folds])
+        summary[f"{metric}_mean"] = float(values.mean())
+        summary[f"{metric}_std"] = float(values.std())
+    summary["folds"] = folds
+    return summary
+
+
+def relative_scores(results: dict, active: list[int], targets: list[str]) -> dict:
+    """
+    Score of each active setting: mean over targets of its mean fold RMSE divided by the best
+    active setting's for that target (1.0 = best on every target). Only folds every active
+    setting has finished are compared.
+    """
+    done = set.intersection(*(
+        {fold["fold"] for fold in results[i][target]} for i in active for target in targets
+    ))
+    mean_rmse = {
+        (i, target): np.mean([fold["rmse"] for fold in results[i][target] if fold["fold"] in done])
+        for i in active for target in targets
+    }
+    best = {target: min(mean_rmse[(i, target)] for i in active) for target in targets}
+    return {i: float(np.mean([mean_rmse[(i, target)] / best[target] for target in targets])) for i in active}
+
+
+def cross_validate(runner, folds: list, base_params: dict, settings: list[dict], prune_margin: float, min_folds: int) -> dict:
+    """
+    GroupKFold cross-validation of every setting for every target.
+
+    A single setting runs all folds x targets as one parallel batch. With
+    several settings the first min_folds folds run together, then one fold
+    per round; after each round settings whose relative score is more than
+    prune_margin above the best are dropped, so clearly worse settings do
+    not pay for the remaining folds.
+
+    Args:
+        runner: an entered FoldRunner over the full feature matrix and target vectors
+        folds: [(train_idx, test_idx)] row positions
+        base_params: target -> Model.training_params
+        settings: parameter overrides to compare
+        prune_margin: e.g. 0.02 drops settings 2% worse than the best
+        min_folds: folds every setting runs before pruning starts
+
+    Returns the report stored under "cv" in metrics.json.
+    """
+    targets = list(base_params)
+    results = {i: {target: [] for target in targets} for i in range(len(settings))}
+    active = list(range(len(settings)))
+    pruned_after = {}
+    pruned_scores = {}
+
+    if len(settings) == 1:
+        rounds = [list(range(len(folds)))]
+    else:
+        min_folds = min(max(min_folds, 1), len(folds))
+        rounds = [list(range(min_folds))] + [[k] for k in range(min_folds, len(folds))]
+
+    for fold_ids in rounds:
+        jobs = [
+            {
+                "key": (i, target, k),
+                "params": {**base_params[target], **settings[i]},
+                "target": target,
+                "train_idx": folds[k][0],
+                "test_idx": folds[k][1]
+            }
+            for i in active for target in targets for k in fold_ids
+        ]
+        for result in runner.run(jobs):
+            i, target, k = result.pop("key")
+            results[i][target].append({"fold": k, **result})
+
+        if len(active) > 1:
+            scores = relative_scores(results, active, targets)
+            for i in list(active):
+                if scores[i] > 1 + prune_margin:
+                    active.remove(i)
+                    pruned_after[i] = max(fold_ids) + 1
+                    pruned_scores[i] = scores[i]
+                    print(f"CV: setting {settings[i]} is {100 * (scores[i] - 1):.1f}% worse, stopped after {pruned_after[i]} folds")
+
+    scores = relative_scores(results, active, targets) if len(active) > 1 else {active[0]: 1.0}
+    best = min(scores, key=scores.get)
+    return {
+        "n_folds": len(folds),
+        "prune_margin": prune_margin,
+        "best_setting": settings[best],
+        "settings": [
+            {
+                "params": settings[i],
+                "pruned_after_folds": pruned_after.get(i),
+                # Pruned settings keep the score they were dropped with
+                "relative_score": scores.get(i, pruned_scores.get(i)),
+                "targets": {target: _summary(sorted(results[i][target], key=lambda fold: fold["fold"])) for target in targets}
+            }
+            for i in range(len(settings))
+        ]
+    }
@@ -0,0 +1,190 @@
+import json
+import time
+
+import numpy as np
+
+from backend.model.utils import preprocess_texts
+from backend.config import DATA_DIR, ENCODER_BACKEND, ENCODER_ONNX_FILE, ENCODER_MIN_COSINE
+
+ENCODER_BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+# Pre-exported graphs in the sentence-transformers hub repos; "onnx" exports one when it is missing
+DEFAULT_ONNX_FILES = {"onnx": "onnx/model.onnx", "onnx-int8": "onnx/model_quint8_avx2.onnx"}
+
+
+class EncoderParityError(Exception):
+    """Raised when an encoder backend's embeddings drift too far from the PyTorch reference."""
+
+
+def quantize_int8(module):
+    """Replace the Linear layers of a torch module with dynamically int8-quantized ones, in place."""
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+
+    return quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def load_encoder(model_name: str, backend: str = ENCODER_BACKEND, onnx_file: str = ENCODER_ONNX_FILE, n_threads: int = 0):
+    """
+    Sentence encoder for serving, on the configured CPU backend.
+
+    Every backend returns a SentenceTransformer, so encode() and the
+    embedding cache work unchanged:
+        torch      full-precision PyTorch (training always uses this one)
+        int8       PyTorch with int8 dynamic quantization of the Linear layers
+        onnx       ONNX Runtime graph (needs optimum[onnxruntime])
+        onnx-int8  ONNX Runtime with the int8-quantized graph
+
+    When the ONNX dependencies are missing the PyTorch backend is used instead.
+
+    Args:
+        model_name: sentence-transformers model, e.g. all-MiniLM-L6-v2
+        backend: one of ENCODER_BACKENDS
+        onnx_file: graph file inside the model repo (DEFAULT_ONNX_FILES if empty)
+        n_threads: ONNX Runtime intra-op threads (0 = one per core); torch threads are process-wide,
+            see backend/model/budget.py
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend!r}, expected one of {ENCODER_BACKENDS}")
+    if backend in ("onnx", "onnx-int8"):
+        try:
+            import onnxruntime
+
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = n_threads
+            return SentenceTransformer(
+                model_name,
+                device="cpu",
+                backend="onnx",
+                model_kwargs={"file_name": onnx_file or DEFAULT_ONNX_FILES[backend], "session_options": session_options}
+            )
+        except ImportError as e:
+            print(f"ONNX encoder unavailable, using PyTorch: {e}")
+            return SentenceTransformer(model_name)
+
+    transformer = SentenceTransformer(model_name)
+    if backend == "int8":
+        transformer = quantize_int8(transformer.to("cpu"))
+    return transformer
+
+
+def cosine_parity(reference: np.ndarray, candidate: np.ndarray) -> dict:
+    """Row-wise cosine similarity of two embedding matrices: mean, p01 and min over the rows."""
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    cosine = np.einsum("ij,ij->i", reference, candidate) / np.where(norms > 0, norms, 1.0)
+    return {
+        "mean": float(cosine.mean()),
+        "p01": float(np.percentile(cosine, 1)),
+        "min": float(cosine.min()),
+        "n": len(cosine)
+    }
+
+
+def check_parity_stats(parity: dict, min_cosine: float = ENCODER_MIN_COSINE) -> dict:
+    """Raise EncoderParityError when the p01 cosine of cosine_parity stats is below min_cosine."""
+    if parity["p01"] < min_cosine:
+        raise EncoderParityError(f"Encoder p01 cosine {parity['p01']:.4f} is below {min_cosine} (min {parity['min']:.4f})")
+    return parity
+
+
+def _rss_mb():
+    # Resident set size of this process, None where /proc is not available
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def _timed_encode(transformer, texts: list[str], batch_size: int) -> dict:
+    transformer.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+    start = time.perf_counter()
+    transformer.encode(texts, batch_size=batch_size)
+    batch_ms = 1000 * (time.perf_counter() - start) / len(texts)
+    start = time.perf_counter()
+    for text in texts[:50]:
+        transformer.encode([text])
+    single_ms = 1000 * (time.perf_counter() - start) / min(len(texts), 50)
+    return {"ms_per_text_batched": batch_ms, "ms_per_text_single": single_ms}
+
+
+def encoder_report(models, df, backend: str, max_rows: int = 5000, batch_size: int = 64) -> dict:
+    """
+    Cost and accuracy of an encoder backend against full-precision PyTorch.
+
+    Both encoders embed the held-out split (first author-grouped fold of df,
+    at most max_rows rows); the report holds their cosine parity, encode
+    latency, RSS added by loading each encoder, and every booster's RMSE on
+    PyTorch vs backend embeddings together with the relative change of its
+    forecasts. Written to DATA_DIR/encoder_report_<backend>.json.
+
+    Args:
+        models: Models loaded with the LightGBM engine
+        df: training rows (snapshot)
+        backend: candidate backend
+    """
+    reference = models.models[models.targets[0]]
+    serving_transformer = reference.transformer
+    test = df.iloc[reference.folds(df)[0][1]]
+    if len(test) > max_rows:
+        test = test.sample(max_rows, random_state=42)
+    texts = [text for text in dict.fromkeys(preprocess_texts(test["text"])) if text] or [""]
+
+    report = {"backend": backend, "model": reference.transformer_model_name, "n_rows": len(test), "n_texts": len(texts)}
+    frames = {}
+    for name in (backend, "torch"):
+        rss_before = _rss_mb()
+        transformer = load_encoder(reference.transformer_model_name, backend=name)
+        rss_after = _rss_mb()
+        report[name] = {**_timed_encode(transformer, texts, batch_size), "rss_mb": None if rss_before is None else rss_after - rss_before}
+        # Encode directly (no embedding store or cache) so each frame holds this backend's embeddings
+        reference.transformer, reference.embedding_store = transformer, None
+        frames[name] = reference.training_frame(test)
+        del transformer
+    reference.transformer = serving_transformer
+
+    report["parity"] = cosine_parity(frames["torch"][reference.text_feat].to_numpy(), frames[backend][reference.text_feat].to_numpy())
+    report["targets"] = {}
+    for target in models.targets:
+        model_instance = models.models[target]
+        y = model_instance.target_values(test).to_numpy()
+        pred = {name: model_instance.model.predict(frames[name][model_instance.feature_names]) for name in frames}
+        scale = np.expm1 if model_instance.log_target else (lambda values: values)
+        relative = np.abs(scale(pred[backend]) - scale(pred["torch"])) / np.maximum(np.abs(scale(pred["torch"])), 1.0)
+        report["targets"][target] = {
+            "rmse_torch": float(np.sqrt(np.mean((pred["torch"] - y) ** 2))),
+            f"rmse_{backend}": float(np.sqrt(np.mean((pred[backend] - y) ** 2))),
+            "forecast_rel_diff_mean": float(relative.mean()),
+            "forecast_rel_diff_p95": float(np.percentile(relative, 95))
+        }
+
+    with open(DATA_DIR / f"encoder_report_{backend}.json", "w") as f:
+        json.dump(report, f, indent=4)
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    from backend.model.models import Models
+    from backend.model.snapshot import SNAPSHOT_NAME, read_snapshot
+
+    # python -m backend.model.encoder [backend]: parity and accuracy of a backend against PyTorch
+    backend = sys.argv[1] if len(sys.argv) > 1 else ENCODER_BACKEND
+    models = Models.load(["views", "likes", "retweets", "comments"], engine="lightgbm", encoder_backend="torch")
+    snapshot_path = DATA_DIR / SNAPSHOT_NAME
+    df = read_snapshot(snapshot_path)[0] if snapshot_path.exists() else models.models["views"].get_data()
+    report = encoder_report(models, df, backend)
+    print(json.dumps({key: report[key] for key in ("parity", backend, "torch")}, indent=4))
+    for target, stats in report["targets"].items():
+        print(target, {key: round(value, 4) for key, value in stats.items()})
+    try:
+        check_parity_stats(report["parity"])
+    except EncoderParityError as e:
+        print(f"Parity check failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.config import INFERENCE_MAX_PENDING, INFERENCE_RETRY_AFTER_SECONDS
+from backend.model.budget import thread_budget
+
+
+class InferenceQueueFull(Exception):
+    """Raised when inference cannot accept more work; maps to a 503 with Retry-After."""
+
+    def __init__(self, message: str = "Inference queue is full", retry_after: int = INFERENCE_RETRY_AFTER_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Bounded thread pool that keeps CPU-bound inference off the event loop.
+
+    The sentence transformer (torch) and LightGBM release the GIL while they
+    compute, so a small thread pool lets I/O-bound endpoints keep running while
+    forecasts are scored. At most `max_workers` jobs run and at most
+    `max_pending` more wait; anything beyond that is rejected immediately with
+    InferenceQueueFull instead of piling up latency.
+    """
+
+    def __init__(self, max_workers: int = None, max_pending: int = INFERENCE_MAX_PENDING):
+        # Default: the executor size of the process's thread budget
+        self.max_workers = max_workers or thread_budget()["executor_workers"]
+        self.max_pending = max_pending
+        self._pool = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        # Created lazily so the pool's threads belong to the process that uses it
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        return self._pool
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit a job or raise InferenceQueueFull when the executor is saturated."""
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_pending:
+                self.rejected += 1
+                raise InferenceQueueFull()
+            self._in_flight += 1
+            pool = self._get_pool()
+        try:
+            future = pool.submit(fn, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn in the pool and await its result from the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected
+            }
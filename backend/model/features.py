@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from backend.model.utils import preprocess_texts
+
+
+def _log1p(values):
+    return np.log1p(np.asarray(values, dtype=np.float64))
+
+
+def _as_int(values):
+    return np.asarray(values).astype(int)
+
+
+def _checkmark(values):
+    mapping = {"blue": 1, "verified": 1, "none": 0}
+    return np.array([mapping.get(value, np.nan) for value in np.atleast_1d(values)], dtype=float)
+
+
+# Same transforms as utils.transform_features, applied to plain arrays
+FEATURE_TRANSFORMS = {
+    "author_followers_count": _log1p,
+    "author_following_count": _log1p,
+    "author_tweet_count": _log1p,
+    "author_age_years": _log1p,
+    "age_hours": _log1p,
+    "is_blue_verified": _as_int,
+    "checkmark_color": _checkmark,
+}
+
+# Features derived from the preprocessed text, computed once per distinct text
+TEXT_STAT_FEATURES = {
+    "text_char_count": len,
+    "text_word_count": lambda text: len(str(text).split()),
+}
+
+
+def factorize_texts(texts):
+    """
+    Preprocess and deduplicate raw texts.
+
+    Returns (codes, processed) where processed holds each distinct
+    preprocessed text once and processed[codes] gives the per-row text.
+    Raw texts that normalize to the same string share one code.
+    """
+    raw_codes, raw_texts = pd.factorize(pd.Series(texts, dtype=object), use_na_sentinel=False)
+    processed = preprocess_texts(raw_texts)
+    processed_codes, processed = pd.factorize(pd.Series(processed, dtype=object), use_na_sentinel=False)
+    return processed_codes[raw_codes], list(processed)
+
+
+class FeatureAssembler:
+    """
+    Writes model features straight into one preallocated contiguous array.
+
+    Columns follow the booster order: num_features + cat_features + text_feat.
+    Input columns can be scalars (broadcast to every row) or arrays of n_rows.
+    """
+
+    def __init__(self, num_features: list[str], cat_features: list[str], text_feat: list[str], dtype=np.float32):
+        self.num_features = list(num_features)
+        self.cat_features = list(cat_features)
+        self.text_feat = list(text_feat)
+        self.dtype = dtype
+
+    @property
+    def feature_names(self) -> list[str]:
+        return self.num_features + self.cat_features + self.text_feat
+
+    @property
+    def n_features(self) -> int:
+        return len(self.num_features) + len(self.cat_features) + len(self.text_feat)
+
+    def assemble(self, columns: dict, n_rows: int, text_codes: np.ndarray, texts: list[str], embeddings: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Args:
+            columns: raw feature values by name (scalar or array of n_rows)
+            n_rows: number of rows to build
+            text_codes: index into texts/embeddings for every row
+            texts: distinct preprocessed texts
+            embeddings: one embedding row per distinct text
+            out: optional preallocated (n_rows, n_features) array to write into
+        """
+        if out is None:
+            out = np.empty((n_rows, self.n_features), dtype=self.dtype)
+
+        for j, feature in enumerate(self.num_features + self.cat_features):
+            if feature in TEXT_STAT_FEATURES:
+                stat = TEXT_STAT_FEATURES[feature]
+                per_text = np.fromiter((stat(text) for text in texts), dtype=np.float64, count=len(texts))
+                out[:, j] = per_text[text_codes]
+            else:
+                transform = FEATURE_TRANSFORMS.get(feature)
+                values = columns[feature]
+                out[:, j] = transform(values) if transform is not None else values
+
+        offset = len(self.num_features) + len(self.cat_features)
+        out[:, offset:] = np.asarray(embeddings)[text_codes]
+        return out
@@ -0,0 +1,191 @@
+import numpy as np
+
+# LightGBM missing value handling per split
+MISSING_NONE = 0
+MISSING_ZERO = 1
+MISSING_NAN = 2
+MISSING_TYPES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+K_ZERO_THRESHOLD = 1e-35
+
+# Array names and dtypes of a packed forest, in storage order
+FOREST_ARRAYS = {
+    "feature": np.int32,
+    "threshold": np.float64,
+    "left": np.int32,
+    "right": np.int32,
+    "value": np.float64,
+    "default_left": np.bool_,
+    "missing_type": np.int8,
+    "roots": np.int32,
+    "target_offsets": np.int32,
+}
+
+
+class ParityError(Exception):
+    """Raised when the packed forest does not reproduce LightGBM predictions."""
+
+
+class PackedForest:
+    """
+    All trees of several LightGBM boosters packed into flat node arrays.
+
+    Every node has a feature (-1 for leaves), threshold, left/right child
+    (global node indices), default direction and missing type; leaves carry
+    their value. Trees of target i are roots[target_offsets[i]:target_offsets[i + 1]].
+    `predict` walks all trees of all targets at once, one vectorized step per
+    tree level, and returns raw booster scores of shape (n_rows, n_targets).
+    """
+
+    def __init__(self, feature, threshold, left, right, value, default_left, missing_type, roots, target_offsets, n_features: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.default_left = default_left
+        self.missing_type = missing_type
+        self.roots = roots
+        self.target_offsets = target_offsets
+        self.n_features = n_features
+
+        # Derived lookup tables for the vectorized walk. Leaves get an infinite
+        # threshold and point to themselves, so they absorb further steps.
+        is_leaf = feature < 0
+        self._split_feature = np.where(is_leaf, 0, feature).astype(np.intp)
+        self._split_threshold = np.where(is_leaf, np.inf, threshold)
+        self._children = np.stack([right, left], axis=1).reshape(-1).astype(np.intp)
+        self._has_zero_missing = bool(np.any(missing_type[~is_leaf] == MISSING_ZERO))
+
+    @property
+    def n_targets(self) -> int:
+        return len(self.target_offsets) - 1
+
+    @property
+    def arrays(self) -> dict:
+        return {name: getattr(self, name) for name in FOREST_ARRAYS}
+
+    @classmethod
+    def from_boosters(cls, boosters: list):
+        """
+        Export LightGBM boosters (one per target) into a packed forest.
+
+        Only the trees LightGBM itself would use for prediction are exported
+        (up to best_iteration when early stopping was used).
+        """
+        nodes = {name: [] for name in ("feature", "threshold", "left", "right", "value", "default_left", "missing_type")}
+        roots = []
+        target_offsets = [0]
+        n_features = None
+
+        def add_node(node):
+            idx = len(nodes["feature"])
+            for name in nodes:
+                nodes[name].append(0)
+            if "leaf_value" in node:
+                nodes["feature"][idx] = -1
+                nodes["value"][idx] = node["leaf_value"]
+                nodes["left"][idx] = idx
+                nodes["right"][idx] = idx
+                return idx
+            if node["decision_type"] != "<=":
+                raise ValueError(f"Unsupported split type: {node['decision_type']}")
+            nodes["feature"][idx] = node["split_feature"]
+            nodes["threshold"][idx] = node["threshold"]
+            nodes["default_left"][idx] = node["default_left"]
+            nodes["missing_type"][idx] = MISSING_TYPES[node["missing_type"]]
+            nodes["left"][idx] = add_node(node["left_child"])
+            nodes["right"][idx] = add_node(node["right_child"])
+            return idx
+
+        for booster in boosters:
+            dump = booster.dump_model()
+            if dump.get("num_tree_per_iteration", 1) != 1:
+                raise ValueError("Only single-output boosters can be packed")
+            if n_features is None:
+                n_features = dump["max_feature_idx"] + 1
+            elif dump["max_feature_idx"] + 1 != n_features:
+                raise ValueError("All boosters must share the same feature matrix")
+            for tree in dump["tree_info"]:
+                roots.append(add_node(tree["tree_structure"]))
+            target_offsets.append(len(roots))
+
+        arrays = {name: np.asarray(values, dtype=FOREST_ARRAYS[name]) for name, values in nodes.items()}
+        return cls(
+            roots=np.asarray(roots, dtype=np.int32),
+            target_offsets=np.asarray(target_offsets, dtype=np.int32),
+            n_features=n_features,
+            **arrays
+        )
+
+    def select_targets(self, indices: list[int]):
+        """A forest over a subset/reordering of the targets, sharing the node arrays."""
+        roots = [self.roots[self.target_offsets[i]:self.target_offsets[i + 1]] for i in indices]
+        target_offsets = np.concatenate([[0], np.cumsum([len(r) for r in roots])]).astype(np.int32)
+        arrays = {**self.arrays, "roots": np.concatenate(roots).astype(np.int32), "target_offsets": target_offsets}
+        return PackedForest(n_features=self.n_features, **arrays)
+
+    def _step_with_missing(self, node: np.ndarray, fval: np.ndarray) -> np.ndarray:
+        # LightGBM's NumericalDecision including missing value routing
+        missing_type = self.missing_type[node]
+        is_nan = np.isnan(fval)
+        fval = np.where(is_nan & (missing_type != MISSING_NAN), 0.0, fval)
+        is_missing = ((missing_type == MISSING_ZERO) & (np.abs(fval) <= K_ZERO_THRESHOLD)) | \
+                     ((missing_type == MISSING_NAN) & is_nan)
+        go_left = np.where(is_missing, self.default_left[node], fval <= self._split_threshold[node])
+        return self._children[2 * node + go_left]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Raw scores for every target, shape (n_rows, n_targets)."""
+        X = np.asarray(X, dtype=np.float64)
+        n_rows, n_trees = X.shape[0], len(self.roots)
+        flat_X = X.reshape(-1)
+        node = np.tile(self.roots.astype(np.intp), n_rows)
+        row_base = np.repeat(np.arange(n_rows, dtype=np.intp) * X.shape[1], n_trees)
+        handle_missing = self._has_zero_missing or bool(np.isnan(flat_X).any())
+
+        # Walk every (row, tree) pair one level at a time, dropping pairs that reached a leaf
+        active = np.flatnonzero(self.feature[node] >= 0)
+        while active.size:
+            current = node[active]
+            fval = flat_X[row_base[active] + self._split_feature[current]]
+            if handle_missing:
+                current = self._step_with_missing(current, fval)
+            else:
+                current = self._children[2 * current + (fval <= self._split_threshold[current])]
+            node[active] = current
+            active = active[self.feature[current] >= 0]
+
+        leaf_values = self.value[node].reshape(n_rows, n_trees)
+        return np.add.reduceat(leaf_values, self.target_offsets[:-1], axis=1)
+
+    def probe_matrix(self, n_rows: int = 256, seed: int = 42) -> np.ndarray:
+        """Rows that exercise split thresholds, including exact ties, for parity checks."""
+        rng = np.random.default_rng(seed)
+        X = rng.standard_normal((n_rows, self.n_features))
+        internal = self.feature >= 0
+        for f in range(self.n_features):
+            thresholds = self.threshold[internal & (self.feature == f)]
+            if len(thresholds) == 0:
+                continue
+            picks = rng.choice(thresholds, size=n_rows)
+            jitter = rng.choice([-1e-6, 0.0, 1e-6], size=n_rows)
+            X[:, f] = picks + jitter * np.maximum(np.abs(picks), 1.0)
+        return X
+
+    def verify(self, boosters: list, X: np.ndarray = None, rtol: float = 1e-9, atol: float = 1e-9, num_threads: int = 1):
+        """
+        Check that the packed forest reproduces LightGBM on X (or a probe matrix).
+
+        Raises ParityError with the worst deviation when it does not. The
+        reference predictions use num_threads LightGBM threads (one by default,
+        so the check never starts an OpenMP pool before serving forks workers).
+        """
+        if X is None:
+            X = self.probe_matrix()
+        packed = self.predict(X)
+        for i, booster in enumerate(boosters):
+            reference = booster.predict(X, num_threads=num_threads)
+            diff = np.abs(packed[:, i] - reference)
+            if not np.all(diff <= atol + rtol * np.abs(reference)):
+                raise ParityError(f"Packed forest deviates from LightGBM for target {i}: max abs diff {diff.max():.3e}")
+        return True
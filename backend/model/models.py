@@ -1,90 +1,645 @@
-from sentence_transformers import SentenceTransformer
-from backend.model.train import Model
-from backend.model.utils import evaluate, plot_feature_importance, get_shap
-from backend.config import DATA_DIR
+from backend.model.train import Model, N_SPLITS
+from backend.model.utils import evaluate
+from backend.model.forest import PackedForest, ParityError
+from backend.model.artifact import (
+    JOINT_ARTIFACT_NAME, PACKED_ARTIFACT_NAME, FEATURE_SPEC_KEYS,
+    save_joint_artifact, load_joint_artifact, save_packed_artifact, open_packed_artifact
+)
+from backend.model.curves import select_knots, interpolate_curves, curve_error_stats
+from backend.model.store import EmbeddingStore
+from backend.model.encoder import load_encoder
+from backend.model.budget import thread_budget, apply_torch_threads
+from backend.model.snapshot import SNAPSHOT_NAME, write_snapshot, read_snapshot
+from backend.model.parallel import fit_targets, threads_per_job, FoldRunner
+from backend.model.cv import DEFAULT_SETTINGS, cross_validate
+from backend.model.report import report_job, start_report
+from backend.config import (
+    DATA_DIR, EMBEDDING_STORE_DIR, ENCODER_BACKEND, MODEL_ENGINE, FORECAST_KNOTS, TRAIN_MAX_WORKERS, TRAIN_REPORT, SHAP_SAMPLE_SIZE,
+    INCREMENTAL_ROUNDS, INCREMENTAL_MIN_ROWS, INCREMENTAL_MAX_DEGRADATION, CV_MAX_WORKERS, CV_MIN_FOLDS, CV_PRUNE_MARGIN
+)
 import pandas as pd
+import numpy as np
 import json
+import time
 class Models:
     def __init__(self, targets: list[str]):
         self.targets = targets
         self.models = {}
+        self.forest = None
+        self.report_process = None
+        # CPU thread budget applied at load (see backend/model/budget.py)
+        self.thread_budget = None
+        # Training metadata stored in the artifact header (watermark, last full retrain metrics)
+        self.training = {}
+        # Backend of the shared sentence encoder (training builds its own full-precision one)
+        self.encoder_backend = "torch"
 
-    def train(self):
+    def train(self, from_snapshot: bool = False, max_workers: int = TRAIN_MAX_WORKERS, report: bool = TRAIN_REPORT,
+              shap_sample_size: int = SHAP_SAMPLE_SIZE):
+        """
+        Train every target on one shared training snapshot.
+
+        The DB read, feature pipeline, split and embeddings run once; each
+        target only selects its own column. With max_workers > 1 the per-target
+        fits run in a process pool over a memory-mapped feature matrix, each
+        with its share of the cores.
+
+        Args:
+            from_snapshot: reuse the snapshot of the previous run instead of querying the database
+            max_workers: parallel per-target fits (1 = one after another)
+            report: render evaluation, feature importance and SHAP plots in a background
+                process after the artifact is saved (DATA_DIR/reports/<target>/)
+            shap_sample_size: test rows SHAP is computed on, stratified by target value
+        """
         metrics = {}
+        # One transformer and one on-disk embedding store shared by every target
+        reference = Model(target=self.targets[0])
+        reference.embedding_store = EmbeddingStore(EMBEDDING_STORE_DIR, reference.transformer_model_name)
+        df, snapshot_hash = self.training_snapshot(reference, from_snapshot=from_snapshot)
+        X_train, X_test, train_idx, test_idx = reference.split_features(df)
+
+        workers = max(1, min(max_workers, len(self.targets)))
+        n_threads = threads_per_job(workers)
+        jobs = {}
         for target in self.targets:
-            print(f"Training model for {target}")
-            model_instance = Model(target=target)
-            df = model_instance.get_data()
-            X_train, X_test, y_train, y_test = model_instance.split_data(df)
-            trained_model = model_instance.train(X_train, X_test, y_train, y_test)
-            model_metrics = evaluate(DATA_DIR,trained_model, X_test, y_test, y_train)
-            plot_feature_importance(DATA_DIR,trained_model, model_instance.num_features + model_instance.cat_features + model_instance.text_feat, model_instance.transformer)
-            get_shap(DATA_DIR,trained_model, X_test, model_instance.transformer)
-            model_instance.save()
-            metrics[target] = model_metrics
-        
+            model_instance = Model(target=target, sentece_transformer=reference.transformer, embedding_store=reference.embedding_store)
+            y_train, y_test = model_instance.split_target(df, train_idx, test_idx)
+            self.models[target] = model_instance
+            jobs[target] = {
+                "params": model_instance.training_params(X_train.columns.tolist(), n_threads=n_threads),
+                "y_train": y_train,
+                "y_test": y_test
+            }
+
+        print(f"Training {len(jobs)} targets with {workers} worker(s) x {n_threads} thread(s)")
+        start = time.perf_counter()
+        fitted = fit_targets(jobs, X_train, X_test, max_workers=workers, directory=DATA_DIR)
+        wall_seconds = time.perf_counter() - start
+
+        for target in self.targets:
+            model_instance = self.models[target]
+            trained_model, seconds = fitted[target]
+            model_instance.model = trained_model
+            print(f"Model for {target} trained in {seconds:.1f}s")
+            model_metrics = evaluate(DATA_DIR,trained_model, X_test, jobs[target]["y_test"], jobs[target]["y_train"], plot=False)
+            metrics[target] = {**model_metrics, "train_seconds": seconds}
+
+        # The boosters changed, any packed forest is stale
+        self.forest = None
+        self.save(training={
+            "mode": "full",
+            "watermark": float(df["observed_at"].max()),
+            "snapshot_sha256": snapshot_hash,
+            "full_metrics": {target: metrics[target] for target in self.targets}
+        })
+        metrics["snapshot"] = {"file": SNAPSHOT_NAME, "sha256": snapshot_hash, "rows": len(df)}
+        metrics["training"] = {"workers": workers, "threads_per_job": n_threads, "wall_seconds": wall_seconds}
+
+        if report:
+            # Plots and SHAP render in the background, the artifact above is already usable
+            report_jobs = {
+                target: report_job(self.models[target].model, X_test, jobs[target]["y_test"], shap_sample_size)
+                for target in self.targets
+            }
+            self.report_process = start_report(DATA_DIR / "reports", report_jobs)
+            print(f"Rendering training reports in the background (pid {self.report_process.pid})")
+
         # save metrics to json
         with open(DATA_DIR / "metrics.json", "w") as f:
             json.dump(metrics, f, indent=4)
 
+    def train_incremental(self, n_rounds: int = INCREMENTAL_ROUNDS, min_rows: int = INCREMENTAL_MIN_ROWS,
+                          max_degradation: float = INCREMENTAL_MAX_DEGRADATION) -> str:
+        """
+        Continue boosting the loaded models on rows observed since the training watermark.
+
+        The new rows are split by author like a full retrain and every booster
+        gets n_rounds more trees fitted on the training part only. A guard then
+        scores each target on the new holdout and drops the update, running a
+        full retrain instead, if its RMSE is more than max_degradation worse
+        than either the boosters before the update on the same holdout or the
+        holdout RMSE of the last full retrain (stored with the artifact).
+
+        The watermark then moves past the holdout rows, so incremental updates
+        never train on them; they are only learned at the next full retrain.
+
+        Call on the output of Models.load(..., engine="lightgbm", encoder_backend="torch"):
+        the boosters were trained on full-precision embeddings, so the new rows must be too.
+        Returns "incremental", "full" (fallback) or "skipped" (not enough new rows).
+        """
+        if self.encoder_backend != "torch":
+            raise ValueError(f"Incremental training needs the torch encoder, these models use {self.encoder_backend!r}")
+        watermark = self.training.get("watermark")
+        full_metrics = self.training.get("full_metrics", {})
+        if watermark is None or any(target not in full_metrics or self.models[target].model is None for target in self.targets):
+            print("No training watermark or boosters in the artifact, running a full retrain")
+            self.train()
+            return "full"
+
+        reference = self.models[self.targets[0]]
+        reference.embedding_store = EmbeddingStore(EMBEDDING_STORE_DIR, reference.transformer_model_name, backend=self.encoder_backend)
+        df = reference.get_data(since=watermark)
+        if len(df) < min_rows or df["author"].nunique() < N_SPLITS:
+            print(f"{len(df)} rows since the watermark, not enough for an incremental update")
+            return "skipped"
+        X_train, X_test, train_idx, test_idx = reference.split_features(df)
+
+        previous = {target: self.models[target].model for target in self.targets}
+        metrics = {}
+        failed = []
+        for target in self.targets:
+            model_instance = self.models[target]
+            y_train, y_test = model_instance.split_target(df, train_idx, test_idx)
+            model_instance.train_incremental(X_train, y_train, n_rounds)
+            rmse = float(np.sqrt(np.mean((model_instance.model.predict(X_test) - y_test) ** 2)))
+            previous_rmse = float(np.sqrt(np.mean((previous[target].predict(X_test) - y_test) ** 2)))
+            metrics[target] = {
+                "rmse": rmse,
+                "previous_rmse": previous_rmse,
+                "full_rmse": full_metrics[target]["rmse"],
+                "train_rows": len(train_idx),
+                "holdout_rows": len(test_idx)
+            }
+            print(f"Incremental {target}: holdout RMSE {rmse:.4f} (before {previous_rmse:.4f}, last full retrain {full_metrics[target]['rmse']:.4f})")
+            # Same-holdout comparison first; the full retrain's RMSE was measured on other rows
+            if rmse > previous_rmse * (1 + max_degradation) or rmse > full_metrics[target]["rmse"] * (1 + max_degradation):
+                failed.append(target)
+
+        if failed:
+            for target in self.targets:
+                self.models[target].model = previous[target]
+            print(f"Incremental update failed the holdout guard for {failed}, running a full retrain")
+            self.train()
+            return "full"
+
+        # The boosters changed, any packed forest is stale
+        self.forest = None
+        self.save(training={
+            **self.training,
+            "mode": "incremental",
+            "watermark": float(df["observed_at"].max()),
+            "incremental_metrics": metrics
+        })
+        metrics_path = DATA_DIR / "metrics.json"
+        all_metrics = json.loads(metrics_path.read_text()) if metrics_path.exists() else {}
+        all_metrics["incremental"] = metrics
+        with open(metrics_path, "w") as f:
+            json.dump(all_metrics, f, indent=4)
+        return "incremental"
+
+    def cross_validate(self, settings: list[dict] = None, from_snapshot: bool = True, max_workers: int = CV_MAX_WORKERS,
+                       prune_margin: float = CV_PRUNE_MARGIN, min_folds: int = CV_MIN_FOLDS) -> dict:
+        """
+        Cross-validate hyperparameter settings over all author-grouped folds and targets.
+
+        Features are built once for the whole snapshot and memory-mapped by
+        every worker; each (setting, target, fold) fit is an independent job.
+        Settings that are clearly worse than the best after min_folds folds
+        are not run on the remaining folds. Does not change the saved models.
+
+        Args:
+            settings: overrides of Model.training_params to compare (DEFAULT_SETTINGS if None)
+            from_snapshot: reuse the training snapshot when it exists
+            max_workers: parallel fold fits (0 = the thread budget's job count)
+            prune_margin: relative RMSE above the best setting at which a setting is dropped
+            min_folds: folds every setting runs before pruning
+
+        Returns the report, also stored under "cv" in metrics.json.
+        """
+        settings = DEFAULT_SETTINGS if settings is None else settings
+        reference = Model(target=self.targets[0])
+        reference.embedding_store = EmbeddingStore(EMBEDDING_STORE_DIR, reference.transformer_model_name)
+        df, snapshot_hash = self.training_snapshot(reference, from_snapshot=from_snapshot)
+        X = reference.training_frame(df)
+        folds = reference.folds(df)
+
+        workers = max_workers or thread_budget(workers=1)["executor_workers"]
+        n_threads = threads_per_job(workers)
+        base_params = {}
+        targets = {}
+        for target in self.targets:
+            model_instance = Model(target=target, sentece_transformer=reference.transformer)
+            base_params[target] = model_instance.training_params(X.columns.tolist(), n_threads=n_threads)
+            targets[target] = model_instance.target_values(df)
+
+        print(f"Cross-validating {len(settings)} setting(s) x {len(self.targets)} targets x {len(folds)} folds "
+              f"with {workers} worker(s) x {n_threads} thread(s)")
+        start = time.perf_counter()
+        with FoldRunner(X, targets, max_workers=workers, directory=DATA_DIR) as runner:
+            report = cross_validate(runner, folds, base_params, settings, prune_margin=prune_margin, min_folds=min_folds)
+        report["wall_seconds"] = time.perf_counter() - start
+        report["snapshot_sha256"] = snapshot_hash
+        print(f"Best setting: {report['best_setting']} ({report['wall_seconds']:.1f}s)")
+
+        metrics_path = DATA_DIR / "metrics.json"
+        all_metrics = json.loads(metrics_path.read_text()) if metrics_path.exists() else {}
+        all_metrics["cv"] = report
+        with open(metrics_path, "w") as f:
+            json.dump(all_metrics, f, indent=4)
+        return report
+
+    def training_snapshot(self, reference: Model, from_snapshot: bool = False):
+        """
+        The training rows shared by all targets, as (df, content hash).
+
+        Runs Model.get_data once and writes its rows to a Parquet snapshot
+        under DATA_DIR, or reads the existing snapshot.
+        """
+        path = DATA_DIR / SNAPSHOT_NAME
+        if from_snapshot and path.exists():
+            df, snapshot_hash = read_snapshot(path)
+            print(f"Training data read from {path} (sha256 {snapshot_hash[:12]})")
+            return df, snapshot_hash
+
+        df = reference.get_data()
+        snapshot_hash = write_snapshot(path, df)
+        print(f"Training snapshot saved to {path} ({len(df)} rows, sha256 {snapshot_hash[:12]})")
+        return df, snapshot_hash
+
+    def save(self, training: dict = None):
+        """
+        Write all targets into the joint artifact (one feature spec, all boosters)
+        and, when the boosters can be packed, the memory-mappable packed artifact.
+
+        Models loaded from the packed artifact alone hold no LightGBM boosters
+        and cannot be saved; load them with engine="lightgbm" first.
+
+        Args:
+            training: training metadata for the headers (watermark, metrics); keeps the current one if None
+        """
+        missing = [target for target in self.targets if self.models[target].model is None]
+        if missing:
+            raise ValueError(f"No LightGBM boosters for {missing} (loaded from {PACKED_ARTIFACT_NAME}?), refusing to save")
+        if training is not None:
+            self.training = training
+        # A models.bin of earlier boosters must never be served next to the new models.pkl,
+        # including when packing fails below
+        packed_path = DATA_DIR / PACKED_ARTIFACT_NAME
+        packed_path.unlink(missing_ok=True)
+        filepath = DATA_DIR / JOINT_ARTIFACT_NAME
+        header = save_joint_artifact(
+            filepath,
+            {target: self.models[target].to_dict() for target in self.targets},
+            metadata={"training": self.training}
+        )
+        print(f"Models saved to {filepath} (sha256 {header['sha256'][:12]})")
+
+        if self.forest is None and not self.use_packed_forest():
+            return
+        model_dicts = {target: self.models[target].to_dict() for target in self.targets}
+        first = model_dicts[self.targets[0]]
+        save_packed_artifact(packed_path, {
+            "feature_spec": {key: first[key] for key in FEATURE_SPEC_KEYS},
+            "targets": {
+                target: {key: model_dicts[target][key] for key in ("target", "max_ratio", "ratio_model", "log_target")}
+                for target in self.targets
+            },
+            "target_order": self.targets,
+            "n_features": self.forest.n_features,
+            "training": self.training
+        }, self.forest.arrays)
+        print(f"Packed models saved to {packed_path}")
+
     @classmethod
-    def load(cls, targets: list[str]):
-        transformer = SentenceTransformer('all-MiniLM-L6-v2')
-        models = {}
-        for target in targets:
-            model_instance = Model.load(DATA_DIR / f"model_{target}.pkl", sentece_transformer=transformer)
-            models[target] = model_instance
+    def load(cls, targets: list[str], engine: str = MODEL_ENGINE, budget: dict = None, encoder_backend: str = ENCODER_BACKEND):
+        """
+        Load all targets for serving, with the CPU thread budget applied.
+
+        Args:
+            targets: target names
+            engine: "lightgbm" or "packed"
+            budget: thread_budget() to apply (derived from the config and SERVE_WORKERS if None)
+            encoder_backend: sentence encoder backend (ENCODER_BACKEND for serving; "torch" for
+                anything that trains or evaluates against the training embeddings)
+        """
+        budget = budget or thread_budget()
+        packed_path = DATA_DIR / PACKED_ARTIFACT_NAME
+        if engine == "packed" and packed_path.exists():
+            return cls.load_packed(targets, packed_path, budget=budget, encoder_backend=encoder_backend)
+
+        joint_path = DATA_DIR / JOINT_ARTIFACT_NAME
+        if joint_path.exists():
+            # One read and one checksum for every target
+            header, model_dicts = load_joint_artifact(joint_path)
+            missing = set(targets) - set(model_dicts)
+            if missing:
+                raise ValueError(f"Targets missing from {joint_path}: {sorted(missing)}")
+            transformer = load_encoder(model_dicts[targets[0]]['transformer_model_name'], backend=encoder_backend,
+                                       n_threads=budget["torch_threads"])
+            models = {target: Model.from_dict(model_dicts[target], sentece_transformer=transformer) for target in targets}
+        else:
+            # Legacy layout: one pickle per target
+            header = {}
+            transformer = load_encoder('all-MiniLM-L6-v2', backend=encoder_backend, n_threads=budget["torch_threads"])
+            models = {}
+            for target in targets:
+                model_instance = Model.load(DATA_DIR / f"model_{target}.pkl", sentece_transformer=transformer)
+                models[target] = model_instance
         obj = cls(targets)
         obj.models = models
+        obj.training = header.get("training", {})
+        obj.encoder_backend = encoder_backend
+        obj.use_thread_budget(budget)
+        if engine == "packed":
+            obj.use_packed_forest()
         return obj
-    
 
-    def predict(self, data: dict, age_hours: list[int]):
-        in_data = []
-        for age_hour in age_hours:
-            in_data.append({**data, "age_hours": age_hour})
-        in_data = pd.DataFrame(in_data)
-        predictions = {}
+    @classmethod
+    def load_packed(cls, targets: list[str], filepath, sentece_transformer=None, budget: dict = None,
+                    encoder_backend: str = ENCODER_BACKEND):
+        """
+        Load the packed artifact without unpickling anything.
+
+        Tree tables are memory-mapped read-only, so every worker process that
+        loads the same file shares one copy of them in the page cache.
+        """
+        header, arrays = open_packed_artifact(filepath)
+        order = header["target_order"]
+        missing = set(targets) - set(order)
+        if missing:
+            raise ValueError(f"Targets missing from {filepath}: {sorted(missing)}")
+        feature_spec = header["feature_spec"]
+        budget = budget or thread_budget()
+        if sentece_transformer is None:
+            sentece_transformer = load_encoder(feature_spec["transformer_model_name"], backend=encoder_backend,
+                                               n_threads=budget["torch_threads"])
+
+        forest = PackedForest(n_features=header["n_features"], **arrays)
+        if list(targets) != order:
+            forest = forest.select_targets([order.index(target) for target in targets])
+
+        obj = cls(targets)
+        obj.models = {
+            target: Model.from_dict({**feature_spec, **header["targets"][target], "model": None}, sentece_transformer=sentece_transformer)
+            for target in targets
+        }
+        obj.forest = forest
+        obj.training = header.get("training", {})
+        obj.encoder_backend = encoder_backend
+        obj.use_thread_budget(budget)
+        return obj
+
+    def use_thread_budget(self, budget: dict):
+        """
+        Apply a thread_budget: torch intra-op threads for the encoder and
+        num_threads for every LightGBM predict call. The executor size
+        (budget["executor_workers"]) is applied by whoever creates the InferenceExecutor.
+        """
+        apply_torch_threads(budget["torch_threads"])
+        for model_instance in self.models.values():
+            model_instance.num_threads = budget["lightgbm_threads"]
+        self.thread_budget = budget
+
+    def use_packed_forest(self) -> bool:
+        """
+        Switch inference to the pure-NumPy packed forest.
+
+        All boosters are exported into one PackedForest and checked against
+        LightGBM before use; on any mismatch inference stays on LightGBM.
+        """
+        specs = {tuple(self.models[target].feature_names) for target in self.targets}
+        if len(specs) != 1:
+            print("Packed forest needs one shared feature spec, staying on LightGBM")
+            return False
+        boosters = [self.models[target].model.booster_ for target in self.targets]
+        try:
+            forest = PackedForest.from_boosters(boosters)
+            forest.verify(boosters)
+        except (ParityError, ValueError) as e:
+            print(f"Packed forest disabled, staying on LightGBM: {e}")
+            return False
+        self.forest = forest
+        return True
+
+    def _predict_targets(self, features: dict) -> dict:
+        """Predictions on the target scale as one array per target."""
+        if self.forest is not None:
+            X = features[self.targets[0]]
+            raw = self.forest.predict(X)
+            return {
+                target: self.models[target].postprocess(raw[:, i], X)
+                for i, target in enumerate(self.targets)
+            }
+        return {
+            target: np.atleast_1d(self.models[target].predict(features[target]))
+            for target in self.targets
+        }
+
+    def build_features(self, columns: dict) -> dict:
+        """
+        Build the feature matrix for every target from one shared stage.
+
+        All targets are trained on the same features and share one sentence
+        transformer, so the text is preprocessed and encoded once and the
+        resulting matrix is fed to every booster. Targets with a different
+        feature spec get their own matrix.
+
+        Args:
+            columns: raw feature values by name, scalars are broadcast to every row
+        """
+        matrices = {}
+        features = {}
         for target in self.targets:
             model_instance = self.models[target]
-            prediction = model_instance.predict(in_data)
+            spec = (id(model_instance.transformer), tuple(model_instance.feature_names))
+            if spec not in matrices:
+                matrices[spec] = model_instance.build_features(columns)
+            features[target] = matrices[spec]
+        return features
+
+    @staticmethod
+    def _n_tweets(data) -> int:
+        if isinstance(data, dict):
+            return max((len(v) for v in data.values() if np.ndim(v) > 0), default=1)
+        return len(data)
+
+    @staticmethod
+    def _grid_columns(data, age_hours: list[int]) -> dict:
+        """
+        Columns for every (tweet, age) pair, tweet-major.
+
+        data is a list of row dicts or a dict of per-tweet columns; scalar
+        columns (e.g. one shared text) stay scalar and are broadcast later.
+        """
+        n_ages = len(age_hours)
+        if isinstance(data, dict):
+            columns = {
+                key: value if np.ndim(value) == 0 else np.repeat(np.asarray(value), n_ages)
+                for key, value in data.items()
+            }
+        else:
+            columns = {
+                key: np.repeat(np.asarray([tweet[key] for tweet in data], dtype=object), n_ages)
+                for key in data[0]
+            }
+        columns["age_hours"] = np.tile(np.asarray(age_hours, dtype=np.float64), Models._n_tweets(data))
+        return columns
+
+    def predict_curves(self, data: list[dict], age_hours: list[int], knots: int = None) -> dict:
+        """
+        Forecast curves for every tweet over the age grid.
+
+        With knots > 0 (default FORECAST_KNOTS) the boosters are only evaluated
+        at that many ages and the rest of each curve is filled by monotone
+        PCHIP interpolation in log space (see backend/model/curves.py).
+
+        Args:
+            data: list of tweet dicts, or a dict of per-tweet columns (scalars broadcast)
+
+        Returns target -> array of shape (n_tweets, len(age_hours)).
+        """
+        if knots is None:
+            knots = FORECAST_KNOTS
+        eval_ages = list(age_hours)
+        if knots and knots < len(age_hours) and np.all(np.diff(age_hours) > 0):
+            eval_ages = select_knots(age_hours, knots)
+
+        features = self.build_features(self._grid_columns(data, eval_ages))
+        target_predictions = self._predict_targets(features)
+        curves = {}
+        for target in self.targets:
+            values = target_predictions[target].reshape(self._n_tweets(data), len(eval_ages))
+            if len(eval_ages) != len(age_hours):
+                values = interpolate_curves(eval_ages, values, age_hours)
+            curves[target] = values
+        return curves
+
+    def predict(self, data: dict, age_hours: list[int], knots: int = None):
+        curves = self.predict_curves([data], age_hours, knots=knots)
+        predictions = {}
+        for target in self.targets:
+            prediction = curves[target][0]
             fmt_out = [{"value": float(pred), "age_hours": hours} for hours, pred in zip(age_hours, prediction)]
             predictions[target] = fmt_out
         return predictions
-    
-    def predict_bulk(self, data: list[dict], age_hours: list[int]):
-        in_data = []
-        for idx, tweet in enumerate(data):
-            tw = tweet.copy()
-            tw["tweet_idx"] = idx
-            for age_hour in age_hours:
-                in_data.append({**tw, "age_hours": age_hour})
-        in_data = pd.DataFrame(in_data)
 
+    def predict_many(self, data: list[dict], age_hours: list[int], knots: int = None) -> list[dict]:
+        """
+        Forecast several independent requests in one pass.
+
+        All texts go through a single encode call and every target runs one
+        booster call over all rows. Returns one `predict`-shaped result per input.
+        """
+        curves = self.predict_curves(data, age_hours, knots=knots)
+        out = [{} for _ in data]
         for target in self.targets:
-            model_instance = self.models[target]
-            in_data[target] = model_instance.predict(in_data)
-        
-        # we need to return [{"tweet_idx": 0, "text": "...", "views": [{"value": 100, "age_hours": 0.1} ...,
+            for result, row in zip(out, curves[target]):
+                result[target] = [{"value": float(pred), "age_hours": hours} for hours, pred in zip(age_hours, row)]
+        return out
+
+    def predict_sweep(self, text: str, author_followers_counts: list[int], is_blue_verified: list[int], age_hours: list[int], knots: int = None) -> list[dict]:
+        """
+        Forecast one text across a grid of audience settings.
+
+        The text is encoded once and the feature matrix for the full
+        followers x verification cross product is built in one vectorized pass.
+        Returns one curve set per grid point, followers-major.
+        """
+        followers = np.repeat(np.asarray(author_followers_counts, dtype=np.float64), len(is_blue_verified))
+        verified = np.tile(np.asarray(is_blue_verified, dtype=np.int64), len(author_followers_counts))
+        curves = self.predict_curves({
+            "text": text,
+            "author_followers_count": followers,
+            "is_blue_verified": verified
+        }, age_hours, knots=knots)
+
         out = []
-        for (tweet_idx, text), values in in_data.groupby(["tweet_idx", "text"]):
-            tmp = {"tweet_idx": int(tweet_idx), "text": text}
+        for i, (followers_count, blue) in enumerate(zip(followers, verified)):
+            point = {"author_followers_count": int(followers_count), "is_blue_verified": bool(blue)}
             for target in self.targets:
-                tmp[target] = [float(v) for v in values[target].tolist()]
-            out.append(tmp)
+                point[target] = [{"value": float(pred), "age_hours": hours} for hours, pred in zip(age_hours, curves[target][i])]
+            out.append(point)
         return out
+
+    def predict_bulk(self, data: list[dict], age_hours: list[int], knots: int = None):
+        """
+        Forecast many tweets; returns [{"tweet_idx", "text", <target>: [values per age]}] in input order.
+        """
+        # (n_tweets, n_targets, n_ages) converted to nested lists in one C-level call
+        curves = self.predict_bulk_array(data, age_hours, knots=knots).transpose(0, 2, 1).tolist()
+        return [
+            {"tweet_idx": idx, "text": tweet["text"], **dict(zip(self.targets, curves[idx]))}
+            for idx, tweet in enumerate(data)
+        ]
+
+    def predict_bulk_array(self, data: list[dict], age_hours: list[int], knots: int = None) -> np.ndarray:
+        """Forecasts as one array of shape (n_tweets, n_ages, n_targets), targets in self.targets order."""
+        curves = self.predict_curves(data, age_hours, knots=knots)
+        return np.stack([curves[target] for target in self.targets], axis=-1)
+
+    def knot_report(self, X_test: pd.DataFrame, age_hours: list[int], knot_counts=(3, 4, 5, 6, 8, 10, 12), max_curves: int = 2000) -> dict:
+        """
+        Accuracy of curve-sparse forecasts against the dense curve.
+
+        Every distinct held-out tweet (X_test from Model.split_features, age removed)
+        gets a dense curve over age_hours; for each knot count the curve is
+        rebuilt from the knot ages only and compared. Written to
+        DATA_DIR/curve_knots_report.json to pick FORECAST_KNOTS from data.
+        """
+        feature_names = self.models[self.targets[0]].feature_names
+        age_idx = feature_names.index("age_hours")
+        base = X_test[feature_names].drop(columns=["age_hours"]).drop_duplicates()
+        if len(base) > max_curves:
+            base = base.sample(max_curves, random_state=42)
+        base = X_test.loc[base.index, feature_names].to_numpy(dtype=np.float64)
+
+        n_ages = len(age_hours)
+        X = np.repeat(base, n_ages, axis=0)
+        X[:, age_idx] = np.tile(np.log1p(np.asarray(age_hours, dtype=np.float64)), len(base))
+        dense = self._predict_targets({target: X for target in self.targets})
+
+        report = {"age_hours": list(age_hours), "n_curves": len(base), "knots": {}}
+        for n_knots in knot_counts:
+            knot_ages = select_knots(age_hours, n_knots)
+            knot_idx = [list(age_hours).index(age) for age in knot_ages]
+            report["knots"][n_knots] = {"knot_ages": knot_ages}
+            for target in self.targets:
+                dense_curves = dense[target].reshape(len(base), n_ages)
+                sparse_curves = interpolate_curves(knot_ages, dense_curves[:, knot_idx], age_hours)
+                report["knots"][n_knots][target] = curve_error_stats(dense_curves, sparse_curves)
+
+        with open(DATA_DIR / "curve_knots_report.json", "w") as f:
+            json.dump(report, f, indent=4)
+        return report
         
     
 if __name__ == "__main__":
     import sys
-    import time
     
     # Simple command line argument parsing
-    if len(sys.argv) > 1 and sys.argv[1] == "train":
+    if len(sys.argv) > 1 and sys.argv[1] == "train" and "--incremental" in sys.argv:
+        # Hourly refresh: warm-start from the saved boosters on rows since the watermark
+        models = Models.load(["views", "likes", "retweets", "comments"], engine="lightgbm", encoder_backend="torch")
+        print(f"Incremental training: {models.train_incremental()}")
+    elif len(sys.argv) > 1 and sys.argv[1] == "train":
         print("Starting model training...")
         models = Models(["views", "likes", "retweets", "comments"])
-        models.train()
+        # --from-snapshot retrains on the last snapshot without querying the database,
+        # --parallel fits the targets in a process pool (TRAIN_MAX_WORKERS, default one per target)
+        max_workers = len(models.targets) if "--parallel" in sys.argv else TRAIN_MAX_WORKERS
+        # --report renders plots and SHAP in a background process once the artifact is saved
+        models.train(from_snapshot="--from-snapshot" in sys.argv, max_workers=max_workers, report=TRAIN_REPORT or "--report" in sys.argv)
         print("Model training complete!")
+    elif len(sys.argv) > 1 and sys.argv[1] == "cv":
+        # Parallel GroupKFold cross-validation of DEFAULT_SETTINGS; --fresh re-queries the database
+        models = Models(["views", "likes", "retweets", "comments"])
+        report = models.cross_validate(from_snapshot="--fresh" not in sys.argv)
+        for setting in report["settings"]:
+            print(setting["params"], {target: round(stats["rmse_mean"], 4) for target, stats in setting["targets"].items()})
+    elif len(sys.argv) > 1 and sys.argv[1] == "knots-report":
+        # Compare curve-sparse forecasts with dense ones on the held-out split, on the training embeddings
+        models = Models.load(["views", "likes", "retweets", "comments"], encoder_backend="torch")
+        reference = models.models["views"]
+        snapshot_path = DATA_DIR / SNAPSHOT_NAME
+        df = read_snapshot(snapshot_path)[0] if snapshot_path.exists() else reference.get_data()
+        _, X_test, _, _ = reference.split_features(df)
+        report = models.knot_report(X_test, [0.1] + list(range(1, 25)))
+        for n_knots, stats in report["knots"].items():
+            print(n_knots, {target: round(stats[target]["p95_rel_error"], 4) for target in models.targets})
+    elif len(sys.argv) > 1 and sys.argv[1] == "pack":
+        # Convert the per-target pickles into the joint artifact (packed models hold no boosters to save)
+        models = Models.load(["views", "likes", "retweets", "comments"], engine="lightgbm")
+        models.save()
     else:
         # Default behavior - load and test prediction
         start_time = time.time()
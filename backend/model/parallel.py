@@ -0,0 +1,221 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from backend.config import TRAIN_THREADS_PER_JOB
+
+EARLY_STOPPING_ROUNDS = 50
+
+
+def threads_per_job(max_workers: int) -> int:
+    """LightGBM threads for each of max_workers concurrent fits, so together they fit the machine's cores."""
+    return TRAIN_THREADS_PER_JOB or max(1, (os.cpu_count() or 1) // max(max_workers, 1))
+
+
+def fit_booster(params: dict, X_train, y_train, X_test, y_test, feature_names: list[str]):
+    """Fit one LGBMRegressor with early stopping on the held-out split."""
+    import lightgbm as lgb
+
+    model = lgb.LGBMRegressor(**params)
+    model.fit(
+        X_train, y_train,
+        callbacks=[lgb.early_stopping(stopping_rounds=EARLY_STOPPING_ROUNDS)],
+        eval_set=[(X_test, y_test)],
+        feature_name=feature_names
+    )
+    return model
+
+
+def write_feature_matrix(path, X) -> tuple:
+    """Write a feature frame column by column into a float64 .npy that workers memory-map."""
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=X.shape)
+    for i, column in enumerate(X.columns):
+        out[:, i] = X[column].to_numpy(dtype=np.float64)
+    out.flush()
+    return X.shape
+
+
+def _fit_job(job: dict):
+    # Runs in a worker process: the matrices are shared read-only pages, only y and the booster are pickled
+    start = time.perf_counter()
+    X_train = np.load(job["X_train"], mmap_mode="r")
+    X_test = np.load(job["X_test"], mmap_mode="r")
+    model = fit_booster(job["params"], X_train, job["y_train"], X_test, job["y_test"], job["feature_names"])
+    return job["target"], model, time.perf_counter() - start
+
+
+def fit_targets(jobs: dict, X_train, X_test, max_workers: int, directory) -> dict:
+    """
+    Fit one booster per target, in parallel worker processes when max_workers > 1.
+
+    X_train / X_test are written once as memory-mapped float64 matrices under
+    a temporary directory in `directory`; every worker maps the same files.
+    Each job's params carry its own thread budget (n_jobs), so the workers
+    together stay within the cores they were sized for.
+
+    Args:
+        jobs: target -> {"params", "y_train", "y_test"}
+        X_train, X_test: shared feature frames (booster column order)
+        max_workers: worker processes; 1 fits in this process
+        directory: where the temporary matrices are written
+
+    Returns target -> (model, wall-clock seconds of its fit).
+    """
+    feature_names = X_train.columns.tolist()
+    if max_workers <= 1 or len(jobs) <= 1:
+        results = {}
+        for target, job in jobs.items():
+            start = time.perf_counter()
+            model = fit_booster(job["params"], X_train, job["y_train"], X_test, job["y_test"], feature_names)
+            results[target] = (model, time.perf_counter() - start)
+        return results
+
+    with tempfile.TemporaryDirectory(dir=directory, prefix="train_features_") as tmp:
+        tmp = Path(tmp)
+        write_feature_matrix(tmp / "X_train.npy", X_train)
+        write_feature_matrix(tmp / "X_test.npy", X_test)
+        payloads = [
+            {
+                "target": target,
+                "params": job["params"],
+                "y_train": np.asarray(job["y_train"], dtype=np.float64),
+                "y_test": np.asarray(job["y_test"], dtype=np.float64),
+                "X_train": str(tmp / "X_train.npy"),
+                "X_test": str(tmp / "X_test.npy"),
+                "feature_names": feature_names
+            }
+            for target, job in jobs.items()
+        ]
+        # spawn: the parent holds torch/OpenMP threads that are not fork-safe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs)), mp_context=context) as pool:
+            results = {target: (model, seconds) for target, model, seconds in pool.map(_fit_job, payloads)}
+    return {target: results[target] for target in jobs}
+
+
+def fold_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> dict:
+    """RMSE, MAE and R² on the training target scale."""
+    residual = y_true - y_pred
+    total = np.sum((y_true - y_true.mean()) ** 2)
+    return {
+        "rmse": float(np.sqrt(np.mean(residual ** 2))),
+        "mae": float(np.mean(np.abs(residual))),
+        "r2": float(1 - np.sum(residual ** 2) / total) if total > 0 else 0.0
+    }
+
+
+# Binned Dataset over each worker's mapped feature matrix, by path; fold fits train on row subsets of it
+_FOLD_DATASETS = {}
+PREDICT_CHUNK_ROWS = 65536
+
+
+def _fold_dataset(path: str, n_threads: int):
+    import lightgbm as lgb
+
+    if path not in _FOLD_DATASETS:
+        X = np.load(path, mmap_mode="r")
+        # The label is set per subset; feature_pre_filter off so settings may vary min_child_samples
+        _FOLD_DATASETS[path] = lgb.Dataset(
+            X, label=np.zeros(X.shape[0]), free_raw_data=True,
+            params={"feature_pre_filter": False, "num_threads": n_threads, "verbose": -1}
+        ).construct()
+    return _FOLD_DATASETS[path]
+
+
+def _fit_fold_job(job: dict) -> dict:
+    # Runs in a worker process. Training and early stopping use row subsets of the binned matrix,
+    # so no fold copies the raw float64 rows; only the held-out rows are read back, in chunks, to score
+    import lightgbm as lgb
+
+    start = time.perf_counter()
+    params = dict(job["params"])
+    n_rounds = params.pop("n_estimators", 100)
+    dataset = _fold_dataset(job["X"], params.get("n_jobs", 0))
+    y = np.load(job["y"], mmap_mode="r")
+    train_idx, test_idx = np.sort(job["train_idx"]), np.sort(job["test_idx"])
+    y_test = np.asarray(y[test_idx])
+    # Subsets copy the full Dataset's placeholder label; the fold's is set once they are constructed
+    train_set = dataset.subset(train_idx).construct().set_label(np.asarray(y[train_idx]))
+    valid_set = dataset.subset(test_idx).construct().set_label(y_test)
+    booster = lgb.train(
+        params, train_set, num_boost_round=n_rounds, valid_sets=[valid_set],
+        callbacks=[lgb.early_stopping(stopping_rounds=EARLY_STOPPING_ROUNDS, verbose=False)]
+    )
+    X = np.load(job["X"], mmap_mode="r")
+    y_pred = np.concatenate([
+        booster.predict(X[test_idx[i:i + PREDICT_CHUNK_ROWS]])
+        for i in range(0, len(test_idx), PREDICT_CHUNK_ROWS)
+    ])
+    return {
+        "key": job["key"],
+        **fold_metrics(y_test, y_pred),
+        "best_iteration": int(booster.best_iteration or booster.current_iteration()),
+        "seconds": time.perf_counter() - start
+    }
+
+
+class FoldRunner:
+    """
+    Fits (params, target, fold) jobs over one memory-mapped feature matrix.
+
+    The matrix and every target vector are written once to a temporary
+    directory; jobs only carry their params and fold row positions. Each
+    process bins the mapped matrix once into a LightGBM Dataset and fits every
+    fold on row subsets of it, so a worker holds one binned copy (about an
+    eighth of the float64 matrix) rather than a fancy-indexed copy per fold.
+    Bin boundaries therefore come from all rows, not only the fold's training
+    rows. Jobs run in a spawn process pool when max_workers > 1, otherwise in
+    this process. Use as a context manager so the pool and the files are
+    cleaned up.
+    """
+
+    def __init__(self, X, targets: dict, max_workers: int, directory):
+        self.X = X
+        self.targets = targets
+        self.max_workers = max_workers
+        self.directory = directory
+        self.feature_names = X.columns.tolist()
+        self._tmp = None
+        self._pool = None
+
+    def __enter__(self):
+        self._tmp = tempfile.TemporaryDirectory(dir=self.directory, prefix="cv_features_")
+        tmp = Path(self._tmp.name)
+        write_feature_matrix(tmp / "X.npy", self.X)
+        for target, y in self.targets.items():
+            np.save(tmp / f"y_{target}.npy", np.asarray(y, dtype=np.float64))
+        if self.max_workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown()
+        _FOLD_DATASETS.pop(str(Path(self._tmp.name) / "X.npy"), None)
+        self._tmp.cleanup()
+
+    def run(self, jobs: list[dict]) -> list[dict]:
+        """
+        Fit every job and return its fold metrics, in job order.
+
+        Args:
+            jobs: [{"key", "params", "target", "train_idx", "test_idx"}]
+        """
+        tmp = Path(self._tmp.name)
+        payloads = [
+            {
+                **job,
+                "X": str(tmp / "X.npy"),
+                "y": str(tmp / f"y_{job['target']}.npy"),
+                "feature_names": self.feature_names
+            }
+            for job in jobs
+        ]
+        if self._pool is None:
+            return [_fit_fold_job(payload) for payload in payloads]
+        return list(self._pool.map(_fit_fold_job, payloads))
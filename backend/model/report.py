@@ -0,0 +1,66 @@
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def stratified_sample(y, n: int, n_bins: int = 10, seed: int = 42) -> np.ndarray:
+    """
+    Positions of about n rows, drawn proportionally from quantile bins of y.
+
+    Every bin contributes at least one row, so the tails of the target
+    distribution are always represented in the sample.
+    """
+    y = np.asarray(y)
+    if len(y) <= n:
+        return np.arange(len(y))
+    bins = pd.qcut(y, q=n_bins, labels=False, duplicates="drop")
+    rng = np.random.default_rng(seed)
+    picks = []
+    for b in np.unique(bins):
+        members = np.flatnonzero(bins == b)
+        size = min(len(members), max(1, round(n * len(members) / len(y))))
+        picks.append(rng.choice(members, size=size, replace=False))
+    return np.sort(np.concatenate(picks))
+
+
+def report_job(model, X_test, y_test, shap_sample_size: int) -> dict:
+    """Everything the report process needs for one target; SHAP rows are a stratified sample of the test set."""
+    sample = stratified_sample(y_test, shap_sample_size)
+    return {
+        "model": model,
+        "feature_names": X_test.columns.tolist(),
+        "y_test": np.asarray(y_test),
+        "y_pred": model.predict(X_test),
+        "X_shap": X_test.iloc[sample]
+    }
+
+
+def render_reports(directory, jobs: dict):
+    """Evaluation plots, feature importance and SHAP plots for every target, each in directory/<target>/."""
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend
+    from backend.model.utils import plot_evaluation, plot_feature_importance, get_shap
+
+    for target, job in jobs.items():
+        target_dir = Path(directory) / target
+        target_dir.mkdir(parents=True, exist_ok=True)
+        plot_evaluation(target_dir, job["y_test"], job["y_pred"])
+        plot_feature_importance(target_dir, job["model"], job["feature_names"], None)
+        get_shap(target_dir, job["model"], job["X_shap"], None)
+        print(f"Report for {target} written to {target_dir}")
+
+
+def start_report(directory, jobs: dict):
+    """
+    Render the reports in a separate process and return it without waiting.
+
+    Called after the model artifact is saved, so plotting and SHAP never
+    delay or block a usable model. The process is not a daemon: a CLI run
+    exits once the reports are done.
+    """
+    # spawn: the parent holds torch/OpenMP threads that are not fork-safe
+    process = multiprocessing.get_context("spawn").Process(target=render_reports, args=(str(directory), jobs), name="training-report")
+    process.start()
+    return process
@@ -0,0 +1,59 @@
+import hashlib
+import os
+
+import pandas as pd
+
+from backend.model.artifact import ArtifactError
+
+SNAPSHOT_NAME = "training_snapshot.parquet"
+_HASH_KEY = b"tweet_optimize.sha256"
+
+
+def snapshot_hash(df: pd.DataFrame) -> str:
+    """Content hash of a snapshot: column names plus a per-row hash of every value."""
+    digest = hashlib.sha256("\0".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def write_snapshot(path, df: pd.DataFrame) -> str:
+    """
+    Write the training data as one Parquet file with its content hash in the schema metadata.
+
+    Args:
+        path: destination file
+        df: training rows as returned by Model.get_data, restricted to the columns training uses
+
+    Returns the content hash.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = df.reset_index(drop=True)
+    content_hash = snapshot_hash(df)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _HASH_KEY: content_hash.encode("ascii")})
+
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+    return content_hash
+
+
+def read_snapshot(path, verify: bool = True) -> tuple[pd.DataFrame, str]:
+    """
+    Read a training snapshot.
+
+    Returns (df, content_hash). With verify=True the hash is recomputed and
+    ArtifactError is raised when the data does not match it.
+    """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path)
+    content_hash = (table.schema.metadata or {}).get(_HASH_KEY, b"").decode("ascii")
+    if not content_hash:
+        raise ArtifactError(f"{path} is not a training snapshot")
+    df = table.to_pandas()
+    if verify and snapshot_hash(df) != content_hash:
+        raise ArtifactError(f"Checksum mismatch for {path}")
+    return df, content_hash
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+
+class EmbeddingStore:
+    """
+    Persistent text embeddings for training, one memory-mapped .npy per transformer and encoder backend.
+
+    Rows of `<transformer>.npy` (float32, n x dim) are keyed by a 64-bit blake2b
+    hash of the preprocessed text, stored alongside in `<transformer>.keys.npy`.
+    Lookups only read the rows they need from the mapping. Texts that are not
+    in the store yet are encoded and appended, so every target of a training
+    run, and every later run, only encodes tweets it has never seen.
+
+    Other backends than torch (int8, onnx, ...) produce slightly different
+    vectors, so they get their own `<transformer>.<backend>.npy` and never
+    mix into the full-precision rows training reads.
+    """
+
+    def __init__(self, directory, namespace: str, backend: str = "torch"):
+        self.directory = Path(directory)
+        self.namespace = namespace
+        self.backend = backend
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", namespace if backend == "torch" else f"{namespace}.{backend}")
+        self.vectors_path = self.directory / f"{name}.npy"
+        self.keys_path = self.directory / f"{name}.keys.npy"
+        self._open()
+
+    def _open(self):
+        self._vectors = None
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._index = {}
+        if not (self.vectors_path.exists() and self.keys_path.exists()):
+            return
+        vectors = np.load(self.vectors_path, mmap_mode="r")
+        keys = np.load(self.keys_path)
+        # An interrupted append can leave vectors without keys; those rows are ignored
+        n = min(len(vectors), len(keys))
+        self._vectors = vectors[:n]
+        self._keys = keys[:n]
+        self._index = dict(zip(self._keys.tolist(), range(n)))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @staticmethod
+    def hash_texts(texts: list[str]) -> np.ndarray:
+        return np.fromiter(
+            (int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little") for text in texts),
+            dtype=np.uint64,
+            count=len(texts)
+        )
+
+    def _rows(self, keys: np.ndarray) -> np.ndarray:
+        return np.fromiter((self._index.get(key, -1) for key in keys.tolist()), dtype=np.int64, count=len(keys))
+
+    def _append(self, keys: np.ndarray, embeddings: np.ndarray):
+        n_old = len(self._keys)
+        if self._vectors is not None and self._vectors.shape[1] != embeddings.shape[1]:
+            raise ValueError(
+                f"Embedding size {embeddings.shape[1]} does not match the store ({self._vectors.shape[1]}) at {self.vectors_path}"
+            )
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        tmp_vectors = self.vectors_path.with_name(self.vectors_path.name + ".tmp")
+        out = np.lib.format.open_memmap(tmp_vectors, mode="w+", dtype=np.float32, shape=(n_old + len(keys), embeddings.shape[1]))
+        if n_old:
+            out[:n_old] = self._vectors
+        out[n_old:] = embeddings
+        out.flush()
+        del out
+
+        tmp_keys = self.keys_path.with_name(self.keys_path.name + ".tmp")
+        with open(tmp_keys, "wb") as f:
+            np.save(f, np.concatenate([self._keys, keys]))
+
+        # Vectors first, so the keys file never points past the end of the vectors file
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_keys, self.keys_path)
+        self._open()
+
+    def encode(self, transformer, texts: list[str], batch_size: int = None) -> np.ndarray:
+        """
+        Embeddings for texts, shape (len(texts), dim).
+
+        Args:
+            transformer: object with an encode(list[str]) method, used for texts not in the store
+            texts: preprocessed texts
+            batch_size: encode batch size (transformer default if None)
+        """
+        keys = self.hash_texts(texts)
+        rows = self._rows(keys)
+        missing = np.flatnonzero(rows < 0)
+        if len(missing):
+            new_keys, first = np.unique(keys[missing], return_index=True)
+            new_texts = [texts[i] for i in missing[first]]
+            print(f"Encoding {len(new_texts)} new texts, {len(texts) - len(missing)} read from {self.vectors_path.name}")
+            kwargs = {"batch_size": batch_size} if batch_size else {}
+            embeddings = np.asarray(transformer.encode(new_texts, **kwargs), dtype=np.float32)
+            self._append(new_keys, embeddings.reshape(len(new_texts), -1))
+            rows = self._rows(keys)
+        if self._vectors is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._vectors[rows]
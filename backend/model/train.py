@@ -1,18 +1,38 @@
-from backend.config import DATA_DIR
-from backend.lib.database import db_query
+from datetime import timedelta
+from backend.config import DATA_DIR, ENCODE_BATCH_SIZE, TRAIN_ENCODE_BATCH_SIZE, TRAIN_FETCH_CHUNK_SIZE
+from backend.lib.database import db_stream
 import pandas as pd
-from sklearn.model_selection import GroupKFold
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import lightgbm as lgb
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-from backend.model.utils import  preprocess_text, transform_features, evaluate, plot_feature_importance, get_shap, compare_predictions
+from backend.model.cache import EMBEDDING_CACHE
+from backend.model.features import FeatureAssembler, factorize_texts
+from backend.model.parallel import fit_booster, threads_per_job
+from backend.model.utils import  preprocess_texts, transform_features
 
+# Serving imports this module too: sentence_transformers, sklearn and lightgbm are
+# imported where they are used, so importing Model stays cheap
+
+
+
+# Author-grouped folds; the first one is the holdout split
+N_SPLITS = 5
+
+# Training data constraints
+MIN_HOURS = 1
+MAX_HOURS = 48
+MIN_VIEWS = 10
+
+# Columns get_data computes in SQL instead of reading them from twitter_forecast
+SQL_COLUMNS = {
+    "age_hours": "EXTRACT(EPOCH FROM observation_time - tweet_time)::float8 / 3600",
+    "observed_at": "EXTRACT(EPOCH FROM observation_time)::float8",
+    "author_age_years": "EXTRACT(EPOCH FROM observation_time - author_created_at)::float8 / (3600 * 24 * 365)",
+}
+# NumPy dtype per column in get_data; anything else is float64 (NULL -> NaN)
+COLUMN_DTYPES = {"author": object, "text": object, "checkmark_color": object}
 
 
 class Model:
-    def __init__(self, target="views", sentece_transformer=None, max_ratio=2000, ratio_model:bool=False, log_target:bool=True):
+    def __init__(self, target="views", sentece_transformer=None, max_ratio=2000, ratio_model:bool=False, log_target:bool=True, embedding_store=None):
         self.num_features = [
             "author_followers_count",
             # "author_following_count",
@@ -42,9 +62,14 @@ class Model:
         self.embedding_size = 384  # Size of embeddings from all-MiniLM-L6-v2
         self.text_feat = [f"text_emb_{i}" for i in range(self.embedding_size)]
         if sentece_transformer is None:
+            from sentence_transformers import SentenceTransformer
             self.transformer = SentenceTransformer(self.transformer_model_name)
         else:
             self.transformer = sentece_transformer
+        # Optional EmbeddingStore used by encode_texts at training time
+        self.embedding_store = embedding_store
+        # LightGBM threads per predict call (0 = LightGBM default, all cores); set from the thread budget
+        self.num_threads = 0
 
         self.monotonic_constraints = {
             "author_followers_count": 1,
@@ -54,90 +79,183 @@ class Model:
             "is_blue_verified": 1
         }
         self.max_ratio = max_ratio
-    def get_data(self):
-        df = db_query("SELECT * FROM twitter_forecast")
-        df = pd.DataFrame(df)
-        df["observation_time"] = pd.to_datetime(df["observation_time"])
-        df["tweet_time"] = pd.to_datetime(df["tweet_time"])
-        df["age_hours"] = (df["observation_time"] - df["tweet_time"]).dt.total_seconds() / 3600
-        df["author_created_at"] = pd.to_datetime(df["author_created_at"])
-        df["author_age_years"] = (df["observation_time"] - df["author_created_at"]).dt.total_seconds() / (3600 * 24 * 365)
-
-        # constraints
-        MIN_HOURS = 1
-        MAX_HOURS = 48
-        MIN_VIEWS = 10
-
-        mask = (df["age_hours"] >= MIN_HOURS) & (df["age_hours"] <= MAX_HOURS) & (df["views"] >= MIN_VIEWS)
-        df = df[mask].copy()
-        df["text"] = df["text"].apply(preprocess_text)
+    def get_data(self, chunk_size: int = TRAIN_FETCH_CHUNK_SIZE, since: float = None):
+        """
+        Load the training rows from twitter_forecast.
+
+        Only the columns training uses are selected and the age, views and
+        ratio constraints are applied in SQL. Rows are streamed through a
+        server-side cursor and turned into typed NumPy columns chunk by chunk
+        (texts are preprocessed per chunk), so peak memory beyond the final
+        columns is proportional to chunk_size.
+
+        Args:
+            chunk_size: rows per fetch
+            since: only rows observed after this epoch timestamp (the training watermark)
+        """
+        columns = self.source_columns
+        select = ", ".join(f"{SQL_COLUMNS.get(column, column)} AS {column}" for column in columns)
+        conditions = [
+            "observation_time - tweet_time BETWEEN %s AND %s",
+            "views >= %s",
+            "views::float8 / NULLIF(author_followers_count, 0) < %s"
+        ]
+        params = [timedelta(hours=MIN_HOURS), timedelta(hours=MAX_HOURS), MIN_VIEWS, self.max_ratio]
+        if since is not None:
+            conditions.append("EXTRACT(EPOCH FROM observation_time) > %s")
+            params.append(since)
+        sql = f"SELECT {select} FROM twitter_forecast WHERE {' AND '.join(conditions)}"
+
+        chunks = {column: [] for column in columns}
+        for rows in db_stream(sql, tuple(params), chunk_size=chunk_size, name="twitter_forecast_training"):
+            for column, values in zip(columns, zip(*rows)):
+                if column == "text":
+                    values = preprocess_texts(values)
+                chunks[column].append(np.array(values, dtype=COLUMN_DTYPES.get(column, np.float64)))
+
+        df = pd.DataFrame({
+            column: np.concatenate(parts) if parts else np.empty(0, dtype=COLUMN_DTYPES.get(column, np.float64))
+            for column, parts in chunks.items()
+        })
+        print(f"Loaded {len(df)} training rows")
 
         df["ratio_views"] = df["views"] / df["author_followers_count"]
         df["ratio_likes"] = df["likes"] / df["author_followers_count"]
         df["ratio_retweets"] = df["retweets"] / df["author_followers_count"]
         df["ratio_comments"] = df["comments"] / df["author_followers_count"]
-        df = df[df["ratio_views"] < self.max_ratio].copy()
 
         # df = transform_features(df)
         return df
-    
+
+    @property
+    def source_columns(self) -> list[str]:
+        """Columns get_data selects: groups, text, raw features (text stats are derived later), targets and observation time."""
+        features = [f for f in self.num_features + self.cat_features if f not in ("text_char_count", "text_word_count")]
+        return ["author", "text"] + features + ["views", "likes", "retweets", "comments", "observed_at"]
 
     def split_data(self, df):
-        n_splits = 5  # Number of folds
-        group_kfold = GroupKFold(n_splits=n_splits)
+        X_train, X_test, train_idx, test_idx = self.split_features(df)
+        y_train, y_test = self.split_target(df, train_idx, test_idx)
+        return X_train, X_test, y_train, y_test
 
-        # Use the defined features from earlier
-        X = df.copy()
-        X = transform_features(X)
-        if self.log_target:
-            y = np.log1p(X[self.target])
-        else:
-            y = X[self.target]
+    def split_features(self, df):
+        """
+        Target-independent part of split_data: feature pipeline, author-grouped split and embeddings.
 
-        X = X[self.num_features + self.cat_features + self.text_features].copy()
+        Every target trains on the same rows and features, so Models.train runs
+        this once and only selects the target column per target (split_target).
 
-        # Use author as the group
-        groups = df['author']
+        Returns (X_train, X_test, train_idx, test_idx).
+        """
+        X = self.training_frame(df)
 
         # Get train and test indices for the first fold
-        train_idx, test_idx = next(group_kfold.split(X, y, groups))
+        train_idx, test_idx = self.folds(df)[0]
 
         X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
-        y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
 
-        # Transform text features using sentence transformers
-        X_train_text_embeddings = self.transformer.encode(X_train["text"].tolist())
-        X_test_text_embeddings = self.transformer.encode(X_test["text"].tolist())
+        # Print split information
+        print(f"Training set size: {len(X_train)}")
+        print(f"Test set size: {len(X_test)}")
+        print(f"Number of unique authors in training: {X_train.index.map(df['author']).nunique()}")
+        print(f"Number of unique authors in test: {X_test.index.map(df['author']).nunique()}")
+        print(f"Features used: {self.num_features + self.cat_features + self.text_features}")
+        return X_train, X_test, train_idx, test_idx
 
-        # Convert embeddings to DataFrame and concatenate with original features
-        X_train_text_df = pd.DataFrame(
-            X_train_text_embeddings,
-            columns=self.text_feat,
-            index=X_train.index
-        )
-        X_test_text_df = pd.DataFrame(
-            X_test_text_embeddings,
+    def training_frame(self, df):
+        """Features of every row of df in booster column order, text replaced by its embeddings."""
+        # Use the defined features from earlier
+        X = df.copy()
+        X = transform_features(X)
+        X = X[self.num_features + self.cat_features + self.text_features].copy()
+
+        # Transform text features using sentence transformers, once per distinct text
+        X_text_df = pd.DataFrame(
+            self.encode_texts(X["text"]),
             columns=self.text_feat,
-            index=X_test.index
+            index=X.index
         )
 
         # Drop the original text column and concatenate with transformer embeddings
-        X_train = X_train.drop(columns=["text"]).join(X_train_text_df)
-        X_test = X_test.drop(columns=["text"]).join(X_test_text_df)
+        return X.drop(columns=["text"]).join(X_text_df)
+
+    def folds(self, df) -> list:
+        """(train_idx, test_idx) row positions of all N_SPLITS author-grouped folds."""
+        from sklearn.model_selection import GroupKFold
+
+        group_kfold = GroupKFold(n_splits=N_SPLITS)
+        # Use author as the group
+        return list(group_kfold.split(df, groups=df['author']))
+
+    def split_target(self, df, train_idx, test_idx):
+        """This model's target for the rows of split_features, as (y_train, y_test)."""
+        y = self.target_values(df)
+        return y.iloc[train_idx], y.iloc[test_idx]
+
+    def target_values(self, df):
+        """The training target for every row of df (log1p when log_target)."""
+        if self.log_target:
+            return np.log1p(df[self.target])
+        return df[self.target]
+
+    def encode_texts(self, texts, batch_size: int = TRAIN_ENCODE_BATCH_SIZE) -> np.ndarray:
+        """
+        Embed preprocessed texts, encoding each distinct text only once.
+
+        The table holds many observations of the same tweet, so texts are
+        deduplicated through a hash table, the unique ones are encoded in
+        batches and the embeddings are scattered back to the rows by index.
+        With an embedding_store, texts embedded by earlier targets or runs
+        are read from disk instead of being encoded again.
+
+        Args:
+            texts: preprocessed texts, one per row
+            batch_size: texts per transformer.encode batch
+        """
+        codes, unique_texts = pd.factorize(pd.Series(texts, dtype=object), use_na_sentinel=False)
+        print(f"Encoding {len(unique_texts)} unique texts for {len(codes)} rows")
+        if self.embedding_store is not None:
+            embeddings = self.embedding_store.encode(self.transformer, list(unique_texts), batch_size=batch_size)
+        else:
+            embeddings = np.asarray(self.transformer.encode(list(unique_texts), batch_size=batch_size), dtype=np.float32)
+        return embeddings.reshape(len(unique_texts), self.embedding_size)[codes]
 
-        # Print split information
-        print(f"Training set size: {len(X_train)}")
-        print(f"Test set size: {len(X_test)}")
-        print(f"Number of unique authors in training: {X_train.index.map(df['author']).nunique()}")
-        print(f"Number of unique authors in test: {X_test.index.map(df['author']).nunique()}")
-        print(f"Features used: {X.columns.tolist()}")
-        return X_train, X_test, y_train, y_test
-    
     def train(self, X_train, X_test, y_train, y_test):
-        early_stop_callback = lgb.early_stopping(stopping_rounds=50)
-        
-        # Create a constraint array based on feature presence
         feature_names = X_train.columns.tolist()
+        model = fit_booster(self.training_params(feature_names), X_train, y_train, X_test, y_test, feature_names)
+        self.model = model  # Store the trained model in the instance
+        return model
+
+    def train_incremental(self, X_train, y_train, n_rounds: int):
+        """
+        Continue boosting the current booster on new rows only.
+
+        Adds n_rounds trees fitted on the residuals of the existing model
+        (up to its best iteration); no early stopping, so a holdout stays
+        unbiased for the caller's guard.
+        """
+        import lightgbm as lgb
+
+        feature_names = X_train.columns.tolist()
+        init_model = lgb.Booster(model_str=self.model.booster_.model_to_string())
+        model = lgb.LGBMRegressor(**{**self.training_params(feature_names), "n_estimators": n_rounds})
+        model.fit(X_train, y_train, init_model=init_model, feature_name=feature_names)
+        self.model = model
+        return model
+
+    def training_params(self, feature_names: list[str], n_threads: int = None) -> dict:
+        """
+        LGBMRegressor parameters for this target.
+
+        LightGBM runs in deterministic, column-wise mode with a fixed seed, so
+        repeated runs on the same snapshot give the same boosters, whether the
+        targets are fitted one after another or in a process pool.
+
+        Args:
+            feature_names: booster column order
+            n_threads: LightGBM threads for this fit (all cores if None)
+        """
+        # Create a constraint array based on feature presence
         monotone_constraints_array = []
         
         for feature in feature_names:
@@ -146,7 +264,7 @@ class Model:
             else:
                 monotone_constraints_array.append(0)  # No constraint
         
-        params = {
+        return {
             'objective': 'regression',
             'metric': 'rmse',
             # 'metric': 'mae',
@@ -156,13 +274,28 @@ class Model:
             'learning_rate': 0.05,
             'num_leaves': 31,
             'random_state': 42,
-            'monotone_constraints': monotone_constraints_array
+            'monotone_constraints': monotone_constraints_array,
+            'n_jobs': n_threads or threads_per_job(1),
+            'deterministic': True,
+            'force_col_wise': True
         }
-        model = lgb.LGBMRegressor(**params)
-        model.fit(X_train, y_train, callbacks=[early_stop_callback], eval_set=[(X_test, y_test)], feature_name=feature_names)
-        self.model = model  # Store the trained model in the instance
-        return model
     
+    def to_dict(self):
+        """All components needed for prediction, as stored in the model artifacts."""
+        return {
+            'model': self.model,
+            'transformer_model_name': self.transformer_model_name,
+            'num_features': self.num_features,
+            'cat_features': self.cat_features,
+            'text_features': self.text_features,
+            'text_feat': self.text_feat,
+            'embedding_size': self.embedding_size,
+            'target': self.target,
+            'max_ratio': self.max_ratio,
+            'ratio_model': self.ratio_model,
+            'log_target': self.log_target
+        }
+
     def save(self):
         """
         Save the model and its components to disk.
@@ -178,19 +311,7 @@ class Model:
         filepath.parent.mkdir(parents=True, exist_ok=True)
         
         # Prepare a dictionary with all components needed for prediction
-        model_data = {
-            'model': self.model,
-            'transformer_model_name': self.transformer_model_name,
-            'num_features': self.num_features,
-            'cat_features': self.cat_features,
-            'text_features': self.text_features,
-            'text_feat': self.text_feat,
-            'embedding_size': self.embedding_size,
-            'target': self.target,
-            'max_ratio': self.max_ratio,
-            'ratio_model': self.ratio_model,
-            'log_target': self.log_target
-        }
+        model_data = self.to_dict()
         
         # Save the model data
         with open(filepath, 'wb') as f:
@@ -205,72 +326,104 @@ class Model:
         # Load the model data
         with open(filepath, 'rb') as f:
             model_data = pickle.load(f)
-        
-        # Create a new instance
-        instance = cls()
+        return cls.from_dict(model_data, sentece_transformer=sentece_transformer)
+
+    @classmethod
+    def from_dict(cls, model_data, sentece_transformer=None):
+        if sentece_transformer is None:
+            from sentence_transformers import SentenceTransformer
+            sentece_transformer = SentenceTransformer(model_data['transformer_model_name'])
+
+        # Create a new instance (reusing the transformer instead of loading a default one)
+        instance = cls(sentece_transformer=sentece_transformer)
         
         # Restore all components
         instance.model = model_data['model']
         instance.transformer_model_name = model_data['transformer_model_name']
-        if sentece_transformer is None:
-            instance.transformer = SentenceTransformer(instance.transformer_model_name)
-        else:
-            instance.transformer = sentece_transformer
         instance.num_features = model_data['num_features']
         instance.cat_features = model_data['cat_features']
         instance.text_features = model_data['text_features']
         instance.text_feat = model_data['text_feat']
         instance.embedding_size = model_data['embedding_size']
+        instance.target = model_data['target']
         instance.max_ratio = model_data['max_ratio']
         instance.ratio_model = model_data['ratio_model']
         instance.log_target = model_data['log_target']
         return instance
-    
+
+    @property
+    def feature_names(self):
+        return self.num_features + self.cat_features + self.text_feat
+
+    def build_features(self, data, dtype=np.float32):
+        """
+        Turn raw inputs into the feature matrix the booster was trained on.
+
+        Features are written straight into one contiguous array in booster
+        column order. Rows that share a text (e.g. the same tweet at different
+        ages) are preprocessed and encoded once, and the embedding is broadcast
+        back to every row.
+
+        Args:
+            data: dict of columns (scalars are broadcast), list of row dicts or
+                DataFrame; must contain 'text' and the numeric features
+            dtype: dtype of the returned matrix
+        """
+        if isinstance(data, pd.DataFrame):
+            columns = {col: data[col].to_numpy() for col in data.columns}
+        elif isinstance(data, list):
+            columns = {col: [row.get(col) for row in data] for col in data[0]} if data else {"text": []}
+        else:
+            columns = data
+
+        n_rows = max((len(v) for v in columns.values() if np.ndim(v) > 0), default=1)
+        texts = columns["text"]
+        if np.ndim(texts) == 0:
+            # One text shared by every row
+            text_codes, texts = factorize_texts([texts])
+            text_codes = np.repeat(text_codes, n_rows)
+        else:
+            text_codes, texts = factorize_texts(texts)
+
+        # Encode each distinct preprocessed text once (or serve it from the
+        # process-wide cache) and broadcast to its rows
+        text_embeddings = EMBEDDING_CACHE.encode(
+            self.transformer, texts, namespace=self.transformer_model_name, batch_size=ENCODE_BATCH_SIZE
+        )
+
+        assembler = FeatureAssembler(self.num_features, self.cat_features, self.text_feat, dtype=dtype)
+        return assembler.assemble(columns, n_rows, text_codes, texts, text_embeddings)
+
     def predict(self, data):
         # Check if model exists
-        if not hasattr(self, 'model'):
+        if getattr(self, 'model', None) is None:
             raise ValueError("Model not trained. Call train() first or load a trained model.")
         
-        # Convert dictionary to DataFrame if needed
-        if isinstance(data, dict):
-            data = pd.DataFrame([data])
-        
-        # Make a copy to avoid modifying the original data
-        X = data.copy()
-        
-        # Check if data needs text preprocessing or if it's already processed
-        if "text" in X.columns:
-            # Raw data with text - needs preprocessing
-            X["text"] = X["text"].apply(preprocess_text)
-            
-            # Transform numeric features
-            X = transform_features(X)
-            
-            # Extract features in the right order
-            X = X[self.num_features + self.cat_features + self.text_features].copy()
-
-            # Transform text features using sentence transformers
-            X_text_embeddings = self.transformer.encode(X["text"].tolist())
-            
-            # Convert embeddings to DataFrame
-            X_text_df = pd.DataFrame(
-                X_text_embeddings,
-                columns=self.text_feat,
-                index=X.index
-            )
-            
-            # Drop text column and join with embedding features
-            X = X.drop(columns=["text"]).join(X_text_df)
-        else:
+        if isinstance(data, np.ndarray):
+            # Already a feature matrix in booster column order
+            X = data
+        elif isinstance(data, pd.DataFrame) and "text" not in data.columns:
             # Check if this is already processed data (has embedding feature columns)
-            has_text_features = all(feature in X.columns for feature in self.text_feat[:5])
+            has_text_features = all(feature in data.columns for feature in self.text_feat[:5])
             
             if not has_text_features:
                 raise ValueError("Input data must contain either 'text' column or transformer processed text features")
+            X = data[self.feature_names].to_numpy(dtype=np.float64)
+        else:
+            # Raw data with text - build the feature matrix
+            X = self.build_features(data)
             
         # Make predictions
-        y_pred_log = self.model.predict(X)
+        params = {"num_threads": self.num_threads} if self.num_threads else {}
+        y_pred = self.postprocess(self.model.booster_.predict(X, **params), X)
         
+        # Return a single value if only one prediction, otherwise return array
+        if len(y_pred) == 1:
+            return y_pred[0]
+        return y_pred
+
+    def postprocess(self, y_pred_log, X):
+        """Map raw booster output for the feature matrix X back to the target scale."""
         # Convert from log space back to original scale
         if self.log_target:
             y_pred = np.expm1(y_pred_log)
@@ -278,15 +431,13 @@ class Model:
             y_pred = y_pred_log
 
         if self.ratio_model:
-            y_pred = y_pred * X["author_followers_count"]
-        
-        # Return a single value if only one prediction, otherwise return array
-        if len(y_pred) == 1:
-            return y_pred[0]
+            y_pred = y_pred * X[:, self.feature_names.index("author_followers_count")]
         return y_pred
 
 
 if __name__ == "__main__":
+    from backend.model.utils import evaluate, plot_feature_importance, get_shap, compare_predictions
+
     model_instance = Model()
     df = model_instance.get_data()
     X_train, X_test, y_train, y_test = model_instance.split_data(df)
@@ -1,7 +1,5 @@
 import re
 import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 
 
 stopwords = {'har', 'they', 'those', 'through', 'each', 'as', 'being', 'blive', 'why', 'thi', 'her', 'how',
@@ -29,18 +27,32 @@ stopwords = {'har', 'they', 'those', 'through', 'each', 'as', 'being', 'blive',
                           'ned', 'mig', 'will', 'our', "haven't", 'she', 'am', 't', 'meget', 'om', 'eller', "shouldn't",
                           'very'}
 
+# A token is a maximal run of word characters that are not digits; everything else separates tokens
+_TOKEN_RE = re.compile(r'[^\W\d]+')
+
+
 def preprocess_text(text):
     if text is None:
         return ""
-    text = text.lower()
-    text = re.sub(r'\W', ' ', text)
-    text = re.sub(r'\d', ' ', text)
-    text = re.sub(r'\n', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    tokens = text.split()
-    tokens = [word for word in tokens if word not in stopwords]
-    text = ' '.join(tokens)
-    return text
+    return ' '.join([word for word in _TOKEN_RE.findall(text.lower()) if word not in stopwords])
+
+
+def preprocess_texts(texts):
+    """
+    preprocess_text over a list or Series of texts, normalizing each distinct text once.
+
+    Returns a list, or a Series with the same index when given a Series.
+    """
+    cache = {}
+    out = []
+    for text in texts:
+        processed = cache.get(text)
+        if processed is None:
+            processed = cache[text] = preprocess_text(text)
+        out.append(processed)
+    if isinstance(texts, pd.Series):
+        return pd.Series(out, index=texts.index, name=texts.name, dtype=object)
+    return out
 
 import numpy as np
 
@@ -71,7 +83,16 @@ def transform_features(x):
     return x
 
 
+def _pyplot():
+    # Plotting is training-only, so pyplot is imported on first use and never by the API process
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend
+    import matplotlib.pyplot as plt
+    return plt
+
+
 def plot_calibration_curve(directory,y_true, y_pred, n_bins=10):
+    plt = _pyplot()
     calib_df = pd.DataFrame({'y_true': y_true, 'y_pred': y_pred})
     
     # Create ntile bins with duplicates='drop' to handle duplicate bin edges
@@ -107,7 +128,32 @@ def plot_calibration_curve(directory,y_true, y_pred, n_bins=10):
 
 
 
-def evaluate(directory, model, X_test, y_test, y_train):
+def plot_evaluation(directory, y_test, y_pred):
+    plt = _pyplot()
+    # Save the calibration plot instead of showing it
+    plt.figure(figsize=(10, 6))
+    plot_calibration_curve(directory,y_test, y_pred)
+    plt.tight_layout()
+    plt.savefig(f"{directory}/calibration_curve.png", dpi=300, bbox_inches='tight')
+    plt.close()
+
+    # Plot actual vs predicted views
+    plt.figure(figsize=(10, 6))
+    plt.scatter(y_test, y_pred, alpha=0.5)
+    plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'r--')
+    plt.xlabel('Actual Views')
+    plt.ylabel('Predicted Views')
+    plt.title('Actual vs Predicted Views')
+    plt.tight_layout()
+    
+    # Save plot instead of showing it
+    plt.savefig(f"{directory}/actual_vs_predicted.png", dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def evaluate(directory, model, X_test, y_test, y_train, plot: bool = True):
+    from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+
     y_pred = model.predict(X_test)
 
     mse = mean_squared_error(y_test, y_pred)
@@ -138,25 +184,8 @@ def evaluate(directory, model, X_test, y_test, y_train):
     if baseline_r2 != 0:
         print(f"Model improvement over baseline (R²): {(baseline_r2 - r2) / baseline_r2 * 100:.2f}%")
     
-    # Save the calibration plot instead of showing it
-    plt.figure(figsize=(10, 6))
-    plot_calibration_curve(directory,y_test, y_pred)
-    plt.tight_layout()
-    plt.savefig(f"{directory}/calibration_curve.png", dpi=300, bbox_inches='tight')
-    plt.close()
-
-    # Plot actual vs predicted views
-    plt.figure(figsize=(10, 6))
-    plt.scatter(y_test, y_pred, alpha=0.5)
-    plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'r--')
-    plt.xlabel('Actual Views')
-    plt.ylabel('Predicted Views')
-    plt.title('Actual vs Predicted Views')
-    plt.tight_layout()
-    
-    # Save plot instead of showing it
-    plt.savefig(f"{directory}/actual_vs_predicted.png", dpi=300, bbox_inches='tight')
-    plt.close()
+    if plot:
+        plot_evaluation(directory, y_test, y_pred)
 
     return {
         "rmse": rmse,
@@ -170,6 +199,7 @@ def evaluate(directory, model, X_test, y_test, y_train):
 
 
 def plot_feature_importance(directory, model, features, transformer):
+    plt = _pyplot()
     # Check if model is a Pipeline or a direct regressor
     if hasattr(model, 'named_steps'):
         # It's a Pipeline
@@ -213,6 +243,7 @@ def plot_feature_importance(directory, model, features, transformer):
 
 def get_shap(directory, model, X_test, transformer):
     import shap
+    plt = _pyplot()
 
     # Create a SHAP explainer for the model
     # Check if model is a Pipeline or a direct regressor
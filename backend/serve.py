@@ -0,0 +1,185 @@
+"""
+Preload-then-fork serving: python -m backend.serve
+
+The master imports backend.main once, so Models.load (encoder and boosters),
+TweetGenerator and the app are built a single time. It then freezes those
+objects out of the garbage collector and forks SERVE_WORKERS uvicorn workers
+that accept on one shared listening socket. Workers share the loaded model
+pages copy-on-write instead of each loading its own copy; every worker prints
+its unique memory (USS) once it is ready.
+
+Native thread pools do not survive fork: a worker whose master already ran a
+multi-threaded OpenMP region (LightGBM, torch) or created an ONNX Runtime
+session can hang on its first prediction. The master therefore loads with
+OMP_NUM_THREADS=1 and never predicts; workers get the previous value back
+(for anything they start) and use the thread budget's explicit counts
+(backend/model/budget.py).
+
+Workers that exit unexpectedly are restarted. SIGTERM stops all workers.
+"""
+import gc
+import importlib
+import os
+import signal
+import socket
+import time
+import traceback
+
+from backend.config import DATA_DIR, ENCODER_BACKEND, MODEL_ENGINE, SERVE_HOST, SERVE_PORT, SERVE_WORKERS
+from backend.model.artifact import PACKED_ARTIFACT_NAME
+
+
+def memory_stats() -> dict:
+    """
+    Memory of this process in MB, from /proc/self/smaps_rollup (empty where unavailable).
+
+    uss: pages mapped only by this process (Private_Clean + Private_Dirty), what one more worker costs
+    pss: resident pages with shared ones divided among the processes that map them
+    rss: all resident pages, shared ones counted in full
+    """
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        return {}
+    return {
+        "uss_mb": round((fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024, 1),
+        "pss_mb": round(fields.get("Pss", 0) / 1024, 1),
+        "rss_mb": round(fields.get("Rss", 0) / 1024, 1)
+    }
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Listening socket created by the master and inherited by every worker."""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def check_fork_safety(workers: int, encoder_backend: str = ENCODER_BACKEND, engine: str = MODEL_ENGINE, data_dir=DATA_DIR):
+    """
+    Refuse (ValueError) or warn about model configurations that do work in the master before forking.
+
+    ONNX encoders create their ONNX Runtime session, and its thread pool, at
+    load, so they are refused with more than one worker. The packed engine
+    without a packed artifact builds and verifies the forest in the master
+    at every start; that runs single-threaded but belongs in
+    `python -m backend.model.models pack`.
+    """
+    if workers <= 1:
+        return
+    if encoder_backend in ("onnx", "onnx-int8"):
+        raise ValueError(f"ENCODER_BACKEND={encoder_backend} is not fork-safe, use SERVE_WORKERS=1 or the torch/int8 backend")
+    if engine == "packed" and not (data_dir / PACKED_ARTIFACT_NAME).exists():
+        print(f"Warning: no {PACKED_ARTIFACT_NAME}, the packed forest is built and verified in the master; "
+              f"run python -m backend.model.models pack", flush=True)
+
+
+def run_worker(app, sock: socket.socket):
+    """Serve app on the inherited socket until uvicorn is told to stop."""
+    import uvicorn
+
+    async def report_memory():
+        print(f"Worker {os.getpid()} ready: {memory_stats()}", flush=True)
+
+    app.router.on_startup.append(report_memory)
+    uvicorn.Server(uvicorn.Config(app)).run(sockets=[sock])
+
+
+def _fork_worker(app, sock: socket.socket, omp_num_threads: str = None) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    # Worker: default signal handling (uvicorn installs its own), collector back on for request garbage
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    gc.enable()
+    # OMP_NUM_THREADS=1 was only for loading in the master; restore what the environment had
+    if omp_num_threads is None:
+        os.environ.pop("OMP_NUM_THREADS", None)
+    else:
+        os.environ["OMP_NUM_THREADS"] = omp_num_threads
+    code = 0
+    try:
+        run_worker(app, sock)
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    os._exit(code)
+
+
+def serve(app: str = "backend.main:app", workers: int = SERVE_WORKERS, host: str = SERVE_HOST, port: int = SERVE_PORT):
+    """
+    Load the app once and serve it from `workers` forked processes (in this process when workers <= 1).
+
+    Follows the gc.freeze recipe: the collector is disabled while the models
+    load so no freed holes are left in their pages, and everything allocated
+    so far is frozen right before forking, so collections in the workers never
+    write to (and copy) the shared objects.
+
+    Args:
+        app: "module:attribute" of the ASGI app, imported once in the master
+        workers: worker processes
+        host, port: address of the shared listening socket
+    """
+    check_fork_safety(workers)
+    omp_num_threads = os.environ.get("OMP_NUM_THREADS")
+    if workers > 1:
+        gc.disable()
+        # Loading must not start OpenMP thread pools the workers would inherit broken;
+        # predict calls still pass the budget's thread counts explicitly
+        os.environ["OMP_NUM_THREADS"] = "1"
+    start = time.perf_counter()
+    module_name, attribute = app.split(":")
+    app = getattr(importlib.import_module(module_name), attribute)
+    print(f"App loaded in {time.perf_counter() - start:.1f}s: {memory_stats()}", flush=True)
+
+    sock = bind_socket(host, port)
+    if workers <= 1:
+        gc.enable()
+        run_worker(app, sock)
+        return
+
+    gc.freeze()
+    children = {_fork_worker(app, sock, omp_num_threads) for _ in range(workers)}
+    print(f"Serving on {host}:{port} with {workers} workers: {sorted(children)}", flush=True)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        # Ctrl-C already reaches the whole process group; forwarding it would force-quit the workers
+        if signum == signal.SIGTERM:
+            for pid in list(children):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited with status {status}, restarting", flush=True)
+            time.sleep(1)
+            if not stopping:
+                children.add(_fork_worker(app, sock, omp_num_threads))
+    sock.close()
+
+
+if __name__ == "__main__":
+    serve()
@@ -16,7 +16,8 @@ echo -e "${BLUE}Starting Twitter Forecast services...${NC}"
 
 # Start backend
 echo -e "${GREEN}Starting backend service...${NC}"
-cd "$ROOT_DIR/backend" && uvicorn main:app --reload --port 8001 &
+# Same preload-then-fork entry point as production (SERVE_WORKERS, default 1), from the repo root
+cd "$ROOT_DIR" && SERVE_PORT=8001 python -m backend.serve &
 BACKEND_PID=$!
 
 # Check if backend started successfully
@@ -40,7 +41,7 @@ if ! ps -p $FRONTEND_PID > /dev/null; then
 fi
 
 echo -e "${GREEN}All services started successfully!${NC}"
-echo -e "${BLUE}Backend running at:${NC} http://localhost:8000"
+echo -e "${BLUE}Backend running at:${NC} http://localhost:8001"
 echo -e "${BLUE}Frontend running at:${NC} http://localhost:5173"
 
 # Keep script running
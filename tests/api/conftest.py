@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+
+class FakeQuota:
+    """QuotaService stand-in: a fixed allowance and a log of every charge and refund."""
+
+    def __init__(self, remaining: int = 1000):
+        self.remaining = remaining
+        self.charges = []
+        self.refunds = []
+
+    def can_make_prediction(self, user_id: int, cost: int = 1) -> dict:
+        allowed = cost < self.remaining
+        return {"allowed": allowed, "remaining": self.remaining, "reason": None if allowed else "Monthly prediction quota exceeded"}
+
+    def record_prediction(self, user_id: int, cost: int = 1):
+        self.charges.append(cost)
+        self.remaining -= cost
+
+    def refund_prediction(self, user_id: int, cost: int = 1):
+        self.refunds.append(cost)
+        self.remaining += cost
+
+
+@pytest.fixture(scope="session")
+def main(make_encoder):
+    """backend.main imported once, with the fake sentence encoder and placeholder API credentials."""
+    for package in ("fastapi", "lightgbm", "openai", "stripe", "resend", "mixpanel", "bs4"):
+        pytest.importorskip(package)
+    with pytest.MonkeyPatch.context() as mp:
+        # The OpenAI and Google OAuth clients are built at import and refuse empty credentials
+        for name in ("OPENAI_API_KEY", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET"):
+            if not os.getenv(name):
+                mp.setenv(name, "test")
+        import backend.model.models as models_mod
+
+        mp.setattr(models_mod, "load_encoder", lambda *args, **kwargs: make_encoder())
+        import backend.main as main
+    return main
+
+
+@pytest.fixture
+def quota(main, monkeypatch):
+    quota = FakeQuota()
+    monkeypatch.setattr(main, "QuotaService", quota)
+    return quota
+
+
+@pytest.fixture
+def client(main, quota, monkeypatch):
+    """Test client signed in as user 1, with quota and event tracking faked."""
+    from fastapi.testclient import TestClient
+
+    async def track_event(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(main, "track_event", track_event)
+    main.app.dependency_overrides[main.get_current_user] = lambda: {"id": 1}
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from backend.constants import BATCH_FORECAST_MAX_TWEETS
+
+AGE_HOURS = [0.1] + list(range(1, 25))
+
+
+def drafts(texts: list[str]) -> list[dict]:
+    return [
+        {"text": text, "author_followers_count": 100 * (i + 1), "is_blue_verified": i % 2 == 1}
+        for i, text in enumerate(texts)
+    ]
+
+
+# Duplicate texts: the batch path must not regroup drafts by text
+TEXTS = ["hello world", "Shipping v2 today", "hello world", "a thread on pricing", "Shipping v2 today"]
+
+
+@pytest.fixture
+def small_chunks(main, monkeypatch):
+    """Stream above 3 drafts, 2 drafts per chunk."""
+    monkeypatch.setattr(main, "BATCH_FORECAST_STREAM_THRESHOLD", 3)
+    monkeypatch.setattr(main, "BATCH_FORECAST_CHUNK_SIZE", 2)
+
+
+def test_batch_returns_forecasts_in_input_order_and_charges_once(main, client, quota):
+    response = client.post("/tweet-forecast/batch", json={"tweets": drafts(TEXTS[:3])})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [prediction["tweet_idx"] for prediction in body["predictions"]] == [0, 1, 2]
+    assert [prediction["text"] for prediction in body["predictions"]] == TEXTS[:3]
+    expected = main.MODEL.predict_bulk([
+        {**draft, "is_blue_verified": int(draft["is_blue_verified"])} for draft in drafts(TEXTS[:3])
+    ], AGE_HOURS)
+    for prediction, reference in zip(body["predictions"], expected):
+        assert prediction["views"] == pytest.approx(reference["views"])
+    assert quota.charges == [3]
+    assert body["quota_remaining"] == 997
+
+
+def test_large_batches_stream_ndjson_in_input_order(main, client, quota, small_chunks):
+    response = client.post("/tweet-forecast/batch", json={"tweets": drafts(TEXTS)})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["tweet_idx"] for line in lines] == [0, 1, 2, 3, 4]
+    assert [line["text"] for line in lines] == TEXTS
+    assert all(line["age_hours"] == AGE_HOURS for line in lines)
+    assert quota.charges == [5]
+    assert response.headers["X-Quota-Remaining"] == "995"
+
+
+def test_ndjson_accept_header_streams_small_batches(client, quota, small_chunks):
+    response = client.post(
+        "/tweet-forecast/batch",
+        json={"tweets": drafts(TEXTS[:2])},
+        headers={"Accept": "application/x-ndjson"}
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["tweet_idx"] for line in response.text.splitlines()] == [0, 1]
+    assert quota.charges == [2]
+
+
+def test_failed_chunk_ends_the_stream_and_refunds_unscored_drafts(main, client, quota, small_chunks, monkeypatch):
+    calls = []
+    predict_bulk = main.MODEL.predict_bulk
+
+    def fail_second_chunk(data, age_hours):
+        calls.append(len(data))
+        if len(calls) == 2:
+            raise RuntimeError("boom")
+        return predict_bulk(data, age_hours)
+
+    monkeypatch.setattr(main.MODEL, "predict_bulk", fail_second_chunk)
+
+    response = client.post("/tweet-forecast/batch", json={"tweets": drafts(TEXTS)})
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["tweet_idx"] for line in lines] == [0, 1, 2]
+    assert lines[-1] == {"error": "Forecast failed", "tweet_idx": 2, "quota_refunded": 3}
+    assert (quota.charges, quota.refunds) == ([5], [3])
+
+
+@pytest.mark.parametrize("tweets", [
+    [],
+    drafts(["x"]) * (BATCH_FORECAST_MAX_TWEETS + 1),
+    drafts(["hello world", ""]),
+    [{"text": "hello world", "author_followers_count": 0, "is_blue_verified": False}],
+])
+def test_invalid_batches_are_rejected_without_charge(client, quota, tweets):
+    response = client.post("/tweet-forecast/batch", json={"tweets": tweets})
+
+    assert response.status_code == 400
+    assert quota.charges == []
+
+
+def test_batch_over_quota_is_refused(client, quota):
+    quota.remaining = 3
+
+    response = client.post("/tweet-forecast/batch", json={"tweets": drafts(TEXTS[:3])})
+
+    assert response.status_code == 403
+    assert quota.charges == []
@@ -0,0 +1,22 @@
+import threading
+
+from backend.config import INFERENCE_RETRY_AFTER_SECONDS
+from backend.model.executor import InferenceExecutor
+
+DRAFT = {"text": "Shipping v2 today", "author_followers_count": 1000, "is_blue_verified": False}
+
+
+def test_saturated_inference_returns_503_with_retry_after(main, client, quota, monkeypatch):
+    executor = InferenceExecutor(max_workers=1, max_pending=0)
+    monkeypatch.setattr(main, "INFERENCE_EXECUTOR", executor)
+    release = threading.Event()
+    executor.submit(release.wait)
+    try:
+        response = client.post("/tweet-forecast/batch", json={"tweets": [DRAFT, DRAFT]})
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(INFERENCE_RETRY_AFTER_SECONDS)
+    assert quota.charges == []
@@ -0,0 +1,53 @@
+import pytest
+
+from backend.constants import SWEEP_COST, SWEEP_MAX_POINTS
+
+AGE_HOURS = [0.1] + list(range(1, 25))
+TEXT = "Shipping v2 of our app today"
+
+
+def test_sweep_matches_one_predict_per_grid_point(main):
+    model = main.MODEL
+
+    points = model.predict_sweep(TEXT, [150, 12000, 900000], [0, 1], AGE_HOURS)
+
+    assert [(p["author_followers_count"], p["is_blue_verified"]) for p in points] == [
+        (150, False), (150, True), (12000, False), (12000, True), (900000, False), (900000, True)
+    ]
+    for point in points:
+        single = model.predict({
+            "text": TEXT,
+            "author_followers_count": point["author_followers_count"],
+            "is_blue_verified": int(point["is_blue_verified"])
+        }, AGE_HOURS)
+        for target in model.targets:
+            assert [p["age_hours"] for p in point[target]] == AGE_HOURS
+            assert [p["value"] for p in point[target]] == pytest.approx([p["value"] for p in single[target]], rel=1e-12)
+
+
+def test_sweep_endpoint_dedupes_inputs_and_charges_once(client, quota):
+    response = client.post("/tweet-forecast/sweep", json={
+        "text": TEXT,
+        "author_followers_counts": [1000, 50, 1000, 50, 7000],
+        "is_blue_verified": [True, True, False]
+    })
+
+    assert response.status_code == 200
+    points = [(p["author_followers_count"], p["is_blue_verified"]) for p in response.json()["curves"]]
+    assert points == [(1000, True), (1000, False), (50, True), (50, False), (7000, True), (7000, False)]
+    assert quota.charges == [SWEEP_COST]
+    assert response.json()["quota_remaining"] == 1000 - SWEEP_COST
+
+
+def test_sweep_endpoint_rejects_oversized_and_invalid_grids(client, quota):
+    oversized = client.post("/tweet-forecast/sweep", json={
+        "text": TEXT,
+        "author_followers_counts": list(range(1, SWEEP_MAX_POINTS + 1)),
+        "is_blue_verified": [False, True]
+    })
+    invalid = client.post("/tweet-forecast/sweep", json={"text": TEXT, "author_followers_counts": [100, 0]})
+
+    assert oversized.status_code == 400
+    assert str(SWEEP_MAX_POINTS) in oversized.json()["detail"]
+    assert invalid.status_code == 400
+    assert quota.charges == []
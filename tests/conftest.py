@@ -0,0 +1,29 @@
+import pytest
+
+
+class FakeEncoder:
+    """Deterministic stand-in for the sentence transformer; records every text it encodes."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        import numpy as np
+
+        self.encoded.extend(texts)
+        return np.array([
+            np.random.default_rng(abs(hash(text)) % (2 ** 32)).standard_normal(self.dim)
+            for text in texts
+        ], dtype=np.float32).reshape(len(texts), self.dim)
+
+
+@pytest.fixture(scope="session")
+def make_encoder():
+    """FakeEncoder factory, for fixtures wider than one test."""
+    return FakeEncoder
+
+
+@pytest.fixture
+def fake_encoder():
+    return FakeEncoder()
@@ -0,0 +1,101 @@
+import pytest
+
+pytest.importorskip("psycopg2")
+
+import backend.lib.database as database
+from backend.lib.database import Database, db_stream
+
+
+class FakeCursor:
+    def __init__(self, conn, name):
+        self.conn = conn
+        self.name = name
+        self.itersize = None
+        self.remaining = list(conn.rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.closed_cursors.append(self.name)
+
+    def execute(self, sql, params=None):
+        # Named cursors need a transaction
+        assert self.conn.autocommit is False
+        self.conn.executed.append((sql, params))
+
+    def fetchmany(self, size):
+        if self.conn.fail_after is not None and len(self.conn.rows) - len(self.remaining) >= self.conn.fail_after:
+            raise RuntimeError("connection lost")
+        chunk, self.remaining = self.remaining[:size], self.remaining[size:]
+        return chunk
+
+
+class FakeConnection:
+    def __init__(self, rows, fail_after=None):
+        self.rows = rows
+        self.fail_after = fail_after
+        self.autocommit = True
+        self.executed = []
+        self.closed_cursors = []
+        self.rollbacks = 0
+        self.closed = False
+        self.cursor_names = []
+
+    def cursor(self, name=None, **kwargs):
+        self.cursor_names.append(name)
+        return FakeCursor(self, name)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def fake_database(conn) -> Database:
+    db = Database.__new__(Database)
+    db.conn = conn
+    return db
+
+
+ROWS = [(i, f"text {i}") for i in range(7)]
+
+
+def test_stream_yields_chunks_through_a_named_cursor():
+    conn = FakeConnection(ROWS)
+
+    chunks = list(fake_database(conn).stream("SELECT a, b FROM t WHERE a > %s", (0,), chunk_size=3, name="training"))
+
+    assert chunks == [ROWS[0:3], ROWS[3:6], ROWS[6:7]]
+    assert conn.cursor_names == ["training"]
+    assert conn.executed == [("SELECT a, b FROM t WHERE a > %s", (0,))]
+    assert (conn.autocommit, conn.rollbacks, conn.closed_cursors) == (True, 1, ["training"])
+
+
+def test_stream_restores_autocommit_when_a_fetch_fails():
+    conn = FakeConnection(ROWS, fail_after=3)
+    stream = fake_database(conn).stream("SELECT a, b FROM t", chunk_size=3)
+
+    assert next(stream) == ROWS[0:3]
+    with pytest.raises(RuntimeError):
+        next(stream)
+    assert (conn.autocommit, conn.rollbacks) == (True, 1)
+
+
+def test_stream_restores_autocommit_when_the_reader_stops_early():
+    conn = FakeConnection(ROWS)
+    stream = fake_database(conn).stream("SELECT a, b FROM t", chunk_size=2)
+
+    next(stream)
+    stream.close()
+
+    assert (conn.autocommit, conn.rollbacks) == (True, 1)
+
+
+def test_db_stream_closes_its_connection(monkeypatch):
+    conn = FakeConnection(ROWS)
+    monkeypatch.setattr(database, "Database", lambda: fake_database(conn))
+
+    assert sum(len(chunk) for chunk in db_stream("SELECT a, b FROM t", chunk_size=4)) == len(ROWS)
+    assert conn.closed
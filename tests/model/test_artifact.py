@@ -0,0 +1,106 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.model.artifact import PACKED_ARTIFACT_FORMAT, ArtifactError, open_packed_artifact, save_packed_artifact
+
+
+def test_packed_artifact_roundtrip_is_memory_mapped(tmp_path):
+    arrays = {
+        "feature": np.array([3, -1, -1], dtype=np.int32),
+        "threshold": np.array([0.5, 0.0, 0.0]),
+        "default_left": np.array([True, False, False]),
+        "grid": np.arange(12, dtype=np.float32).reshape(3, 4),
+    }
+    path = tmp_path / "models.bin"
+    save_packed_artifact(path, {"targets": ["views"]}, arrays)
+
+    header, loaded = open_packed_artifact(path, verify=True)
+    assert header["targets"] == ["views"]
+    assert header["format"] == PACKED_ARTIFACT_FORMAT
+    for name, array in arrays.items():
+        np.testing.assert_array_equal(loaded[name], array)
+        assert loaded[name].dtype == array.dtype
+        assert not loaded[name].flags.writeable
+        assert loaded[name].ctypes.data % 64 == 0
+
+
+def test_packed_artifact_detects_corruption(tmp_path):
+    path = tmp_path / "models.bin"
+    save_packed_artifact(path, {}, {"value": np.ones(100)})
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ArtifactError):
+        open_packed_artifact(path, verify=True)
+
+
+def test_training_snapshot_roundtrip_and_hash(tmp_path):
+    pd = pytest.importorskip("pandas")
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    from backend.model.snapshot import read_snapshot, write_snapshot
+
+    df = pd.DataFrame({
+        "author": ["a", "a", "b"],
+        "text": ["hello world", "hello world", "shipping today"],
+        "author_followers_count": [10, 10, 2500],
+        "age_hours": [1.5, 7.25, 30.0],
+        "is_blue_verified": [True, True, False],
+        "views": [12, 40, 900],
+    }, index=[4, 8, 15])
+    path = tmp_path / "training_snapshot.parquet"
+    content_hash = write_snapshot(path, df)
+
+    loaded, loaded_hash = read_snapshot(path)
+    assert loaded_hash == content_hash
+    assert loaded["text"].tolist() == df["text"].tolist()
+    np.testing.assert_array_equal(loaded["age_hours"].to_numpy(), df["age_hours"].to_numpy())
+    assert write_snapshot(tmp_path / "again.parquet", df.iloc[::-1]) != content_hash
+
+    # Same schema metadata, different data
+    table = pq.read_table(path)
+    views = table.schema.get_field_index("views")
+    tampered = table.set_column(views, "views", pa.array(loaded["views"] + 1)).replace_schema_metadata(table.schema.metadata)
+    pq.write_table(tampered, path)
+    with pytest.raises(ArtifactError):
+        read_snapshot(path)
+
+
+def test_models_without_boosters_refuse_to_save(monkeypatch, tmp_path):
+    pytest.importorskip("lightgbm")
+    import backend.model.models as models_mod
+    from backend.config import DATA_DIR
+    from backend.model.models import Models
+    from backend.model.train import Model
+
+    monkeypatch.setattr(models_mod, "DATA_DIR", tmp_path)
+    models = Models(["views", "likes"])
+    models.models = {target: Model.load(DATA_DIR / f"model_{target}.pkl", sentece_transformer=object()) for target in models.targets}
+    # What load_packed builds: feature spec and forest, no boosters
+    models.models["likes"].model = None
+
+    with pytest.raises(ValueError, match="likes"):
+        models.save()
+    assert not any(tmp_path.iterdir())
+
+
+def test_save_removes_stale_packed_artifact_when_packing_fails(monkeypatch, tmp_path):
+    pytest.importorskip("lightgbm")
+    import backend.model.models as models_mod
+    from backend.config import DATA_DIR
+    from backend.model.models import Models
+    from backend.model.train import Model
+
+    monkeypatch.setattr(models_mod, "DATA_DIR", tmp_path)
+    save_packed_artifact(tmp_path / "models.bin", {"targets": ["views"]}, {"value": np.ones(4)})
+    models = Models(["views", "likes"])
+    models.models = {target: Model.load(DATA_DIR / f"model_{target}.pkl", sentece_transformer=object()) for target in models.targets}
+    # e.g. a ParityError: the new boosters cannot be packed
+    monkeypatch.setattr(models, "use_packed_forest", lambda: False)
+
+    models.save()
+
+    assert (tmp_path / "models.pkl").exists()
+    assert not (tmp_path / "models.bin").exists()
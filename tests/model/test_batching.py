@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from backend.model.batching import InferenceBatcher
+from backend.model.executor import InferenceExecutor, InferenceQueueFull
+
+
+class FakeModels:
+    """Records every predict_many call; each result echoes its request."""
+
+    def __init__(self, error: Exception = None):
+        self.calls = []
+        self.error = error
+
+    def predict_many(self, data: list[dict], age_hours: list):
+        self.calls.append(([item["text"] for item in data], age_hours))
+        if self.error is not None:
+            raise self.error
+        return [{"text": item["text"], "age_hours": age_hours} for item in data]
+
+
+def tweet(text: str) -> dict:
+    return {"text": text, "author_followers_count": 100, "is_blue_verified": 0}
+
+
+def run_concurrently(batcher, requests: list) -> list:
+    async def main():
+        return await asyncio.gather(*(batcher.predict(data, ages) for data, ages in requests), return_exceptions=True)
+
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_batch_and_get_their_own_results():
+    models = FakeModels()
+    batcher = InferenceBatcher(models, window_ms=50)
+    texts = [f"draft {i}" for i in range(5)]
+
+    results = run_concurrently(batcher, [(tweet(text), [1, 24]) for text in texts])
+
+    assert models.calls == [(texts, [1, 24])]
+    assert [result["text"] for result in results] == texts
+    stats = batcher.stats()
+    assert (stats["batches"], stats["requests"], stats["batch_size_histogram"]) == (1, 5, {5: 1})
+    assert stats["mean_batch_size"] == 5
+
+
+def test_batches_are_split_at_max_batch_size():
+    models = FakeModels()
+    batcher = InferenceBatcher(models, window_ms=50, max_batch_size=2)
+    texts = [f"draft {i}" for i in range(5)]
+
+    results = run_concurrently(batcher, [(tweet(text), [1]) for text in texts])
+
+    assert [call[0] for call in models.calls] == [texts[0:2], texts[2:4], texts[4:5]]
+    assert [result["text"] for result in results] == texts
+    assert batcher.stats()["max_batch_size_seen"] == 2
+
+
+def test_requests_are_grouped_by_age_grid():
+    models = FakeModels()
+    batcher = InferenceBatcher(models, window_ms=50)
+    requests = [(tweet("a"), [1, 2]), (tweet("b"), [1]), (tweet("c"), [1, 2]), (tweet("d"), [1])]
+
+    results = run_concurrently(batcher, requests)
+
+    assert sorted(models.calls) == [(["a", "c"], [1, 2]), (["b", "d"], [1])]
+    assert [(result["text"], result["age_hours"]) for result in results] == [(data["text"], ages) for data, ages in requests]
+
+
+def test_batch_failure_reaches_every_waiter():
+    batcher = InferenceBatcher(FakeModels(error=ValueError("boom")), window_ms=50)
+
+    results = run_concurrently(batcher, [(tweet(f"draft {i}"), [1]) for i in range(3)])
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_full_queue_rejects_new_requests():
+    models = FakeModels()
+    batcher = InferenceBatcher(models, window_ms=50, max_queue_depth=1)
+
+    # Both requests are enqueued before the dispatcher first runs
+    results = run_concurrently(batcher, [(tweet("a"), [1]), (tweet("b"), [1])])
+
+    assert results[0]["text"] == "a"
+    assert isinstance(results[1], InferenceQueueFull)
+    assert batcher.stats()["rejected"] == 1
+    assert models.calls == [(["a"], [1])]
+
+
+def test_batches_run_on_the_inference_executor():
+    models = FakeModels()
+    executor = InferenceExecutor(max_workers=1, max_pending=0)
+    batcher = InferenceBatcher(models, window_ms=50, executor=executor)
+    try:
+        results = run_concurrently(batcher, [(tweet("a"), [1]), (tweet("b"), [1])])
+    finally:
+        executor.shutdown()
+
+    assert [result["text"] for result in results] == ["a", "b"]
+    assert executor.stats()["completed"] == 1
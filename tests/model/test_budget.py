@@ -0,0 +1,40 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import backend.model.budget as budget_mod
+from backend.model.budget import thread_budget
+
+
+def test_budget_splits_cores_between_workers_and_jobs(monkeypatch):
+    monkeypatch.setattr(budget_mod, "available_cpus", lambda: 16)
+
+    assert thread_budget(workers=1, cpus=0, jobs=0, threads_per_job=0) == {
+        "workers": 1, "cpus": 16, "executor_workers": 4, "torch_threads": 4, "lightgbm_threads": 4
+    }
+    four = thread_budget(workers=4, cpus=0, jobs=0, threads_per_job=0)
+    assert (four["cpus"], four["executor_workers"], four["torch_threads"]) == (4, 4, 1)
+    # Never below one thread, and explicit values win
+    assert thread_budget(workers=32, cpus=0, jobs=0, threads_per_job=0)["torch_threads"] == 1
+    assert thread_budget(workers=1, cpus=8, jobs=2, threads_per_job=0)["lightgbm_threads"] == 4
+    assert thread_budget(workers=1, cpus=8, jobs=2, threads_per_job=3)["torch_threads"] == 3
+
+
+def test_models_pass_the_budget_to_lightgbm_predict():
+    pytest.importorskip("lightgbm")
+    from backend.config import DATA_DIR
+    from backend.model.models import Models
+    from backend.model.train import Model
+
+    models = Models(["views", "likes"])
+    models.models = {target: Model.load(DATA_DIR / f"model_{target}.pkl", sentece_transformer=object()) for target in models.targets}
+    X = np.random.default_rng(0).standard_normal((50, len(models.models[models.targets[0]].feature_names)))
+    expected = models._predict_targets({target: X for target in models.targets})
+
+    models.use_thread_budget(thread_budget(workers=1, cpus=2, jobs=1, threads_per_job=2))
+
+    assert models.thread_budget["executor_workers"] == 1
+    assert all(models.models[target].num_threads == 2 for target in models.targets)
+    actual = models._predict_targets({target: X for target in models.targets})
+    for target in models.targets:
+        np.testing.assert_allclose(actual[target], expected[target])
@@ -0,0 +1,49 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("lightgbm")
+
+from backend.config import DATA_DIR
+from backend.model.models import Models
+from backend.model.train import Model
+
+AGE_HOURS = [0.1] + list(range(1, 25))
+# Unsorted texts with duplicates: the former groupby assembly returned these sorted by (tweet_idx, text)
+TWEETS = [
+    {"text": "zeta launch thread", "author_followers_count": 500, "is_blue_verified": 0},
+    {"text": "alpha release notes", "author_followers_count": 90000, "is_blue_verified": 1},
+    {"text": "zeta launch thread", "author_followers_count": 12, "is_blue_verified": 1},
+    {"text": "beta signups open", "author_followers_count": 3000, "is_blue_verified": 0},
+    {"text": "alpha release notes", "author_followers_count": 90000, "is_blue_verified": 1},
+]
+
+
+@pytest.fixture(scope="module")
+def models(make_encoder):
+    models = Models(["views", "likes", "retweets", "comments"])
+    encoder = make_encoder()
+    models.models = {target: Model.load(DATA_DIR / f"model_{target}.pkl", sentece_transformer=encoder) for target in models.targets}
+    return models
+
+
+def test_bulk_forecasts_follow_input_order_with_duplicate_texts(models):
+    results = models.predict_bulk(TWEETS, AGE_HOURS)
+
+    assert [result["tweet_idx"] for result in results] == list(range(len(TWEETS)))
+    assert [result["text"] for result in results] == [tweet["text"] for tweet in TWEETS]
+    for tweet, result in zip(TWEETS, results):
+        single = models.predict(tweet, AGE_HOURS)
+        for target in models.targets:
+            np.testing.assert_allclose(result[target], [point["value"] for point in single[target]], rtol=1e-12)
+    # Same draft twice, same forecast; same text with another audience, another forecast
+    assert results[1]["views"] == results[4]["views"]
+    assert results[0]["views"] != results[2]["views"]
+
+
+def test_bulk_array_stacks_targets_last(models):
+    array = models.predict_bulk_array(TWEETS, AGE_HOURS)
+    results = models.predict_bulk(TWEETS, AGE_HOURS)
+
+    assert array.shape == (len(TWEETS), len(AGE_HOURS), len(models.targets))
+    for i, target in enumerate(models.targets):
+        np.testing.assert_array_equal(array[:, :, i], [result[target] for result in results])
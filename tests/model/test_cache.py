@@ -0,0 +1,81 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.model.cache import EmbeddingCache
+
+
+def vector(seed: int, dim: int = 8) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+def test_cache_evicts_least_recently_used_past_entry_cap():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("a", vector(0))
+    cache.put("b", vector(1))
+    assert cache.get("a") is not None  # a is now the most recent
+    cache.put("c", vector(2))
+
+    assert cache.get("b") is None
+    np.testing.assert_array_equal(cache.get("a"), vector(0))
+    np.testing.assert_array_equal(cache.get("c"), vector(2))
+    assert cache.stats()["entries"] == 2
+
+
+def test_cache_evicts_past_byte_cap():
+    # float32, 8 dims: 32 bytes per entry
+    cache = EmbeddingCache(max_entries=100, max_bytes=64)
+    for i in range(4):
+        cache.put(i, vector(i))
+
+    assert cache.stats()["bytes"] == 64
+    assert [cache.get(i) is not None for i in range(4)] == [False, False, True, True]
+    # Overwriting a key replaces its bytes instead of adding to them
+    cache.put(3, vector(5))
+    assert cache.stats()["bytes"] == 64
+
+
+def test_int8_storage_round_trip_error_and_size():
+    cache = EmbeddingCache(dtype="int8")
+    embedding = vector(0, dim=384)
+    cache.put("a", embedding)
+
+    restored = cache.get("a")
+    scale = np.abs(embedding).max() / 127.0
+    assert restored.dtype == np.float32
+    assert np.abs(restored - embedding).max() <= scale / 2 + 1e-6
+    assert cache.stats()["bytes"] == 384 + 4
+
+
+def test_int8_misses_return_what_hits_return(fake_encoder):
+    cache = EmbeddingCache(dtype="int8")
+    texts = ["hello world", "shipping today"]
+
+    miss = cache.encode(fake_encoder, texts)
+    hit = cache.encode(fake_encoder, texts)
+
+    assert fake_encoder.encoded == texts
+    np.testing.assert_array_equal(miss, hit)
+    assert not np.array_equal(miss, fake_encoder.encode(texts))
+
+
+def test_namespaces_do_not_share_entries(fake_encoder):
+    cache = EmbeddingCache()
+    cache.encode(fake_encoder, ["hello world"], namespace="all-MiniLM-L6-v2")
+    cache.encode(fake_encoder, ["hello world"], namespace="all-mpnet-base-v2")
+    cache.encode(fake_encoder, ["hello world"], namespace="all-MiniLM-L6-v2")
+
+    assert fake_encoder.encoded == ["hello world", "hello world"]
+    assert cache.stats()["entries"] == 2
+
+
+def test_stats_count_hits_misses_and_evictions(fake_encoder):
+    cache = EmbeddingCache(max_entries=2)
+    cache.encode(fake_encoder, ["a", "b", "a"])  # three misses: lookups happen before encoding
+    cache.encode(fake_encoder, ["a", "c"])  # a hits, c evicts b
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 4, 1)
+    assert stats["hit_rate"] == pytest.approx(1 / 5)
+    cache.clear()
+    assert (cache.stats()["entries"], cache.stats()["bytes"]) == (0, 0)
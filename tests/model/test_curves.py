@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from backend.model.curves import interpolate_curves, select_knots
+
+AGE_HOURS = [0.1] + list(range(1, 25))
+
+
+@pytest.mark.parametrize("n_knots", range(1, len(AGE_HOURS) + 2))
+def test_knots_span_the_grid_and_match_the_requested_count(n_knots):
+    knots = select_knots(AGE_HOURS, n_knots)
+
+    assert knots[0] == AGE_HOURS[0] and knots[-1] == AGE_HOURS[-1]
+    assert knots == sorted(set(knots))
+    assert set(knots) <= set(AGE_HOURS)
+    assert len(knots) == min(max(n_knots, 2), len(AGE_HOURS))
+
+
+def test_short_grids_get_every_requested_knot():
+    # Evenly spaced log1p targets snap twice to 0.1 here before the gap is filled
+    assert select_knots([0.1, 0.2, 0.3, 1, 48], 4) == [0.1, 0.3, 1, 48]
+
+
+def test_interpolation_is_exact_at_knots_and_keeps_monotone_curves_monotone():
+    rng = np.random.default_rng(0)
+    knots = select_knots(AGE_HOURS, 6)
+    knot_values = np.cumsum(rng.exponential(50.0, size=(200, len(knots))), axis=1)
+    knot_values[:10] = knot_values[:10, :1]  # flat curves stay flat
+
+    curves = interpolate_curves(knots, knot_values, AGE_HOURS)
+
+    assert curves.shape == (200, len(AGE_HOURS))
+    knot_idx = [AGE_HOURS.index(age) for age in knots]
+    np.testing.assert_allclose(curves[:, knot_idx], knot_values, rtol=1e-12)
+    assert np.all(np.diff(curves, axis=1) >= -1e-9 * np.abs(curves[:, 1:]))
+
+
+@pytest.fixture(scope="module")
+def models(make_encoder):
+    pytest.importorskip("lightgbm")
+    from backend.config import DATA_DIR
+    from backend.model.models import Models
+    from backend.model.train import Model
+
+    models = Models(["views", "likes"])
+    encoder = make_encoder()
+    models.models = {target: Model.load(DATA_DIR / f"model_{target}.pkl", sentece_transformer=encoder) for target in models.targets}
+    return models
+
+
+TWEETS = [
+    {"text": "Shipping v2 of our app today", "author_followers_count": 1200, "is_blue_verified": 0},
+    {"text": "hello world", "author_followers_count": 45000, "is_blue_verified": 1},
+]
+
+
+def test_zero_knots_is_the_dense_evaluation_bit_for_bit(models):
+    features = models.build_features(models._grid_columns(TWEETS, AGE_HOURS))
+    dense = models._predict_targets(features)
+
+    curves = models.predict_curves(TWEETS, AGE_HOURS, knots=0)
+
+    for target in models.targets:
+        np.testing.assert_array_equal(curves[target], dense[target].reshape(len(TWEETS), len(AGE_HOURS)))
+
+
+def test_knot_forecasts_match_the_boosters_at_knot_ages(models):
+    knots = select_knots(AGE_HOURS, 5)
+    dense = models.predict_curves(TWEETS, AGE_HOURS, knots=0)
+
+    sparse = models.predict_curves(TWEETS, AGE_HOURS, knots=5)
+
+    knot_idx = [AGE_HOURS.index(age) for age in knots]
+    for target in models.targets:
+        np.testing.assert_allclose(sparse[target][:, knot_idx], dense[target][:, knot_idx], rtol=1e-9)
+
+
+def test_knot_report_scores_every_knot_count(models, monkeypatch, tmp_path):
+    pd = pytest.importorskip("pandas")
+    import backend.model.models as models_mod
+
+    monkeypatch.setattr(models_mod, "DATA_DIR", tmp_path)
+    feature_names = models.models["views"].feature_names
+    X_test = pd.DataFrame(models.build_features(models._grid_columns(TWEETS, [1, 6]))["views"], columns=feature_names)
+
+    report = models.knot_report(X_test, AGE_HOURS, knot_counts=(3, 6, len(AGE_HOURS)))
+
+    assert report["n_curves"] == len(TWEETS)
+    assert json.loads((tmp_path / "curve_knots_report.json").read_text())["n_curves"] == len(TWEETS)
+    for n_knots in (3, 6):
+        assert len(report["knots"][n_knots]["knot_ages"]) == n_knots
+        assert report["knots"][n_knots]["views"]["max_rel_error"] >= 0
+    # Knots at every age rebuild the dense curve
+    assert report["knots"][len(AGE_HOURS)]["views"]["max_rel_error"] == pytest.approx(0, abs=1e-9)
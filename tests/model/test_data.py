@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("psycopg2")
+
+import backend.model.train as train_mod
+from backend.model.train import MAX_HOURS, MIN_HOURS, MIN_VIEWS, Model
+from backend.model.utils import preprocess_text
+
+
+def source_rows(n: int) -> list[tuple]:
+    # In Model.source_columns order: author, text, followers, age_hours, verified, views, likes, retweets, comments, observed_at
+    return [
+        (f"author{i % 3}", f"Tweet #{i}: Shipping TODAY!", 100 * (i + 1), 1.5 + i, i % 2, 1000 + i, 10 + i, i, 2 * i, 1.7e9 + 60 * i)
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Replaces db_stream; records every call and serves source_rows(5) in chunks."""
+    calls = []
+
+    def db_stream(sql, params=None, chunk_size=10000, name="stream"):
+        calls.append({"sql": sql, "params": params, "chunk_size": chunk_size, "name": name})
+        rows = source_rows(5)
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+    monkeypatch.setattr(train_mod, "db_stream", db_stream)
+    return calls
+
+
+def test_get_data_assembles_typed_columns_from_chunks(fetches):
+    model = Model(sentece_transformer=object())
+
+    df = model.get_data(chunk_size=2)
+
+    assert fetches[0]["chunk_size"] == 2
+    assert list(df.columns[:len(model.source_columns)]) == model.source_columns
+    assert len(df) == 5
+    assert df["author"].tolist() == [f"author{i % 3}" for i in range(5)]
+    assert df["text"].tolist() == [preprocess_text(row[1]) for row in source_rows(5)]
+    assert df["views"].dtype == np.float64
+    np.testing.assert_array_equal(df["ratio_views"], df["views"] / df["author_followers_count"])
+
+
+def test_get_data_filters_in_sql(fetches):
+    model = Model(sentece_transformer=object(), max_ratio=500)
+
+    model.get_data()
+
+    sql, params = fetches[0]["sql"], fetches[0]["params"]
+    assert sql.startswith("SELECT author AS author, text AS text")
+    assert "observation_time - tweet_time BETWEEN %s AND %s" in sql and "views >= %s" in sql
+    assert "EXTRACT(EPOCH FROM observation_time) > %s" not in sql
+    assert params == (timedelta(hours=MIN_HOURS), timedelta(hours=MAX_HOURS), MIN_VIEWS, 500)
+    assert fetches[0]["name"] == "twitter_forecast_training"
+
+
+def test_get_data_since_watermark_adds_a_clause(fetches):
+    Model(sentece_transformer=object()).get_data(since=1.7e9)
+
+    sql, params = fetches[0]["sql"], fetches[0]["params"]
+    assert sql.endswith("AND EXTRACT(EPOCH FROM observation_time) > %s")
+    assert params[-1] == 1.7e9
+
+
+def test_get_data_without_rows_returns_empty_columns(monkeypatch):
+    monkeypatch.setattr(train_mod, "db_stream", lambda *args, **kwargs: iter(()))
+
+    df = Model(sentece_transformer=object()).get_data()
+
+    assert len(df) == 0
+    assert "ratio_views" in df
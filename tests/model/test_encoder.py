@@ -0,0 +1,39 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.model.encoder import cosine_parity, check_parity_stats, load_encoder, quantize_int8, EncoderParityError
+
+
+def test_cosine_parity_and_threshold():
+    rng = np.random.default_rng(0)
+    reference = rng.standard_normal((200, 16))
+    assert cosine_parity(reference, reference * 3)["min"] == pytest.approx(1.0)
+
+    drifted = reference + rng.standard_normal(reference.shape) * 0.5
+    parity = cosine_parity(reference, drifted)
+    assert parity["p01"] < parity["mean"] < 1.0
+    with pytest.raises(EncoderParityError):
+        check_parity_stats(parity, min_cosine=0.99)
+    assert check_parity_stats(parity, min_cosine=parity["p01"]) is parity
+
+
+def test_int8_quantization_keeps_linear_outputs_close():
+    torch = pytest.importorskip("torch")
+
+    torch.manual_seed(0)
+    module = torch.nn.Sequential(torch.nn.Linear(64, 64), torch.nn.ReLU(), torch.nn.Linear(64, 32))
+    x = torch.randn(100, 64)
+    with torch.no_grad():
+        expected = module(x).numpy()
+        quantized = quantize_int8(module)
+        actual = quantized(x).numpy()
+
+    assert "quantized" in type(quantized[0]).__module__
+    assert cosine_parity(expected, actual)["p01"] > 0.99
+
+
+def test_unknown_backend_is_rejected():
+    pytest.importorskip("sentence_transformers")
+    with pytest.raises(ValueError):
+        load_encoder("all-MiniLM-L6-v2", backend="fp16")
@@ -0,0 +1,45 @@
+import threading
+
+import pytest
+
+from backend.model.executor import InferenceExecutor, InferenceQueueFull
+
+
+def test_admission_rejects_beyond_workers_plus_pending():
+    executor = InferenceExecutor(max_workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        running = executor.submit(release.wait)
+        waiting = executor.submit(release.wait)
+        with pytest.raises(InferenceQueueFull) as excinfo:
+            executor.submit(release.wait)
+        assert excinfo.value.retry_after > 0
+        assert executor.stats()["in_flight"] == 2
+        assert executor.stats()["rejected"] == 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert running.result() and waiting.result()
+    assert executor.stats()["in_flight"] == 0
+    assert executor.stats()["completed"] == 2
+
+
+def test_failed_jobs_release_their_slot():
+    executor = InferenceExecutor(max_workers=1, max_pending=0)
+
+    def fail():
+        raise ValueError("boom")
+
+    try:
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                executor.submit(fail).result()
+            # Done callbacks run on the worker thread right after the result is set
+            executor.shutdown()
+    finally:
+        executor.shutdown()
+
+    assert executor.stats()["in_flight"] == 0
+    assert executor.stats()["rejected"] == 0
+    assert executor.stats()["completed"] == 3
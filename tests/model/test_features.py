@@ -0,0 +1,78 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("lightgbm")
+pytest.importorskip("sentence_transformers")
+
+from backend.config import DATA_DIR
+from backend.model.cache import EMBEDDING_CACHE
+from backend.model.train import Model
+from backend.model.utils import preprocess_text, transform_features
+
+AGE_HOURS = [0.1] + list(range(1, 25))
+
+
+def legacy_features(model, df):
+    """The per-request pandas pipeline Model.predict used before the assembler."""
+    X = df.copy()
+    X["text"] = X["text"].apply(preprocess_text)
+    X = transform_features(X)
+    X = X[model.num_features + model.cat_features + model.text_features].copy()
+    embeddings = model.transformer.encode(X["text"].tolist())
+    X_text_df = pd.DataFrame(embeddings, columns=model.text_feat, index=X.index)
+    return X.drop(columns=["text"]).join(X_text_df)
+
+
+@pytest.fixture(scope="module")
+def model(make_encoder):
+    EMBEDDING_CACHE.clear()
+    return Model.load(DATA_DIR / "model_views.pkl", sentece_transformer=make_encoder())
+
+
+@pytest.fixture
+def rows():
+    texts = ["Hello, world!", "Shipping v2 of our app today 🚀 #buildinpublic", "", "123 !!!", "Hello, world!"]
+    return pd.DataFrame([
+        {"text": text, "author_followers_count": 10 ** (i + 1), "is_blue_verified": i % 2, "age_hours": age}
+        for i, text in enumerate(texts) for age in AGE_HOURS
+    ])
+
+
+def test_feature_matrix_matches_pandas_pipeline(model, rows):
+    legacy = legacy_features(model, rows)
+    matrix = model.build_features(rows)
+
+    assert matrix.dtype == np.float32
+    assert matrix.flags["C_CONTIGUOUS"]
+    assert matrix.shape == legacy.shape
+    np.testing.assert_allclose(matrix, legacy[model.feature_names].to_numpy(dtype=np.float32), rtol=1e-6)
+
+
+def test_scalar_columns_broadcast_over_age_grid(model):
+    single = model.build_features({
+        "text": "Hello, world!",
+        "author_followers_count": 100,
+        "is_blue_verified": 1,
+        "age_hours": np.asarray(AGE_HOURS, dtype=np.float64)
+    })
+    rows = model.build_features([
+        {"text": "Hello, world!", "author_followers_count": 100, "is_blue_verified": 1, "age_hours": age}
+        for age in AGE_HOURS
+    ])
+    np.testing.assert_array_equal(single, rows)
+
+
+def test_predictions_match_pandas_pipeline(model, rows):
+    legacy = np.expm1(model.model.predict(legacy_features(model, rows)))
+    np.testing.assert_allclose(model.predict(rows), legacy, rtol=1e-5)
+
+
+def test_training_encode_dedupes_texts(model, fake_encoder, make_encoder):
+    texts = ["hello world", "shipping app today", "", "hello world", "shipping app today", "hello world"]
+    trainer = Model(sentece_transformer=fake_encoder)
+
+    embeddings = trainer.encode_texts(pd.Series(texts, index=[10, 3, 7, 1, 2, 5]))
+
+    assert sorted(fake_encoder.encoded) == sorted(set(texts))
+    np.testing.assert_array_equal(embeddings, make_encoder().encode(texts))
@@ -0,0 +1,42 @@
+import pickle
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("lightgbm")
+
+from backend.config import DATA_DIR
+from backend.model.forest import PackedForest
+
+TARGETS = ["views", "likes", "retweets", "comments"]
+
+
+@pytest.fixture(scope="module")
+def boosters():
+    out = []
+    for target in TARGETS:
+        with open(DATA_DIR / f"model_{target}.pkl", "rb") as f:
+            out.append(pickle.load(f)["model"].booster_)
+    return out
+
+
+@pytest.fixture(scope="module")
+def forest(boosters):
+    return PackedForest.from_boosters(boosters)
+
+
+def test_packed_forest_matches_lightgbm(forest, boosters):
+    X = forest.probe_matrix(512, seed=7)
+    expected = np.stack([booster.predict(X) for booster in boosters], axis=1)
+    np.testing.assert_allclose(forest.predict(X), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_packed_forest_routes_missing_values_like_lightgbm(forest, boosters):
+    X = forest.probe_matrix(64, seed=11)
+    X[::2, :5] = np.nan
+    expected = np.stack([booster.predict(X) for booster in boosters], axis=1)
+    np.testing.assert_allclose(forest.predict(X), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_verify_accepts_float32_feature_matrix(forest, boosters):
+    assert forest.verify(boosters, forest.probe_matrix(32).astype(np.float32))
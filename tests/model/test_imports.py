@@ -0,0 +1,40 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# What backend.main imports from the model package
+SERVING_MODULES = ["backend.model.models", "backend.model.batching", "backend.model.executor", "backend.model.cache"]
+# Training, reporting and encoder/booster runtimes that must only load when used (training, Models.load)
+LAZY_PACKAGES = {"matplotlib", "sklearn", "shap", "lightgbm", "torch", "sentence_transformers", "scipy"}
+# Currently ~0.6s; the heavy packages above add ~9s
+SERVING_IMPORT_BUDGET_SECONDS = 3.0
+
+ROOT = Path(__file__).resolve().parents[2]
+_LINE_RE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)")
+
+
+def importtime(modules: list[str]) -> tuple[set, float]:
+    """Top-level packages imported and total cumulative seconds, from `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    packages = set()
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match is None:
+            continue
+        cumulative, indent, name = match.groups()
+        packages.add(name.split(".")[0])
+        if len(indent) == 1:  # top-level imports of the -c statement
+            total_us += int(cumulative)
+    return packages, total_us / 1e6
+
+
+def test_serving_imports_stay_within_budget():
+    packages, seconds = importtime(SERVING_MODULES)
+
+    assert not packages & LAZY_PACKAGES, f"serving imports training-only packages: {sorted(packages & LAZY_PACKAGES)}"
+    assert seconds < SERVING_IMPORT_BUDGET_SECONDS, f"serving import took {seconds:.2f}s"
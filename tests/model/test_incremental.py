@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("lightgbm")
+pytest.importorskip("sklearn")
+
+import backend.model.models as models_mod
+from backend.config import DATA_DIR
+from backend.model.models import Models
+from backend.model.train import Model
+
+WATERMARK = 1.7e9
+TARGETS = ["views", "likes"]
+
+
+def new_rows(n: int = 300, seed: int = 0) -> pd.DataFrame:
+    """Rows observed after WATERMARK, as Model.get_data returns them."""
+    rng = np.random.default_rng(seed)
+    followers = rng.integers(50, 200000, size=n).astype(np.float64)
+    views = np.round(followers * rng.uniform(0.05, 0.8, size=n)) + 10
+    df = pd.DataFrame({
+        "author": [f"author{i}" for i in rng.integers(0, 30, size=n)],
+        "text": [f"launch thread number {i % 40}" for i in range(n)],
+        "author_followers_count": followers,
+        "age_hours": rng.uniform(1, 48, size=n),
+        "is_blue_verified": rng.integers(0, 2, size=n).astype(np.float64),
+        "views": views,
+        "likes": np.round(views * rng.uniform(0.005, 0.05, size=n)),
+        "retweets": np.round(views * 0.002),
+        "comments": np.round(views * 0.001),
+        "observed_at": WATERMARK + np.arange(1, n + 1) * 60.0,
+    })
+    for target in ("views", "likes", "retweets", "comments"):
+        df[f"ratio_{target}"] = df[target] / df["author_followers_count"]
+    return df
+
+
+@pytest.fixture
+def models(monkeypatch, tmp_path, make_encoder):
+    """Models from the shipped boosters with a watermark; writes, reads and full retrains are redirected."""
+    monkeypatch.setattr(models_mod, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(models_mod, "EMBEDDING_STORE_DIR", tmp_path / "embeddings")
+    encoder = make_encoder()
+    models = Models(TARGETS)
+    models.models = {target: Model.load(DATA_DIR / f"model_{target}.pkl", sentece_transformer=encoder) for target in TARGETS}
+    models.training = {"watermark": WATERMARK, "full_metrics": {target: {"rmse": 1.0} for target in TARGETS}}
+    models.reads = []
+    models.full_retrains = []
+    monkeypatch.setattr(models, "train", lambda **kwargs: models.full_retrains.append(kwargs))
+
+    def get_data(model, since=None, **kwargs):
+        models.reads.append(since)
+        return models.rows
+
+    monkeypatch.setattr(Model, "get_data", get_data)
+    models.rows = new_rows()
+    return models
+
+
+def boosters(models) -> dict:
+    return {target: models.models[target].model for target in TARGETS}
+
+
+def test_without_watermark_runs_a_full_retrain(models):
+    models.training = {}
+
+    assert models.train_incremental() == "full"
+    assert models.full_retrains and not models.reads
+
+
+def test_too_few_new_rows_are_skipped(models):
+    before = boosters(models)
+
+    assert models.train_incremental(min_rows=len(models.rows) + 1) == "skipped"
+    assert models.reads == [WATERMARK]
+    assert boosters(models) == before and not models.full_retrains
+
+
+def test_update_within_the_guard_is_saved_and_advances_the_watermark(models, tmp_path):
+    before = boosters(models)
+
+    assert models.train_incremental(n_rounds=5, min_rows=100, max_degradation=10.0) == "incremental"
+
+    assert not models.full_retrains
+    assert all(models.models[target].model is not before[target] for target in TARGETS)
+    assert models.training["watermark"] == models.rows["observed_at"].max()
+    assert models.training["mode"] == "incremental"
+    metrics = json.loads((tmp_path / "metrics.json").read_text())["incremental"]
+    assert set(metrics) == set(TARGETS)
+    assert (tmp_path / "models.pkl").exists()
+
+
+def test_update_worse_than_the_previous_boosters_falls_back(models):
+    # The last full retrain's RMSE is no obstacle; the same-holdout comparison must catch it
+    models.training["full_metrics"] = {target: {"rmse": 1e9} for target in TARGETS}
+    before = boosters(models)
+
+    assert models.train_incremental(n_rounds=5, min_rows=100, max_degradation=-0.99) == "full"
+
+    assert models.full_retrains
+    assert boosters(models) == before
+    assert models.training["watermark"] == WATERMARK
+
+
+def test_update_worse_than_the_last_full_retrain_falls_back(models):
+    models.training["full_metrics"] = {target: {"rmse": 1e-9} for target in TARGETS}
+    before = boosters(models)
+
+    assert models.train_incremental(n_rounds=5, min_rows=100, max_degradation=10.0) == "full"
+
+    assert models.full_retrains
+    assert boosters(models) == before
+
+
+def test_int8_serving_models_cannot_write_to_the_training_store(monkeypatch, tmp_path, make_encoder):
+    backends = []
+
+    def load_encoder(model_name, backend, n_threads=0):
+        backends.append(backend)
+        return make_encoder()
+
+    monkeypatch.setattr(models_mod, "load_encoder", load_encoder)
+    monkeypatch.setattr(models_mod, "EMBEDDING_STORE_DIR", tmp_path)
+    monkeypatch.setattr(Model, "get_data", lambda model, **kwargs: new_rows())
+    models = Models.load(TARGETS, engine="lightgbm", encoder_backend="int8")
+    models.training = {"watermark": WATERMARK, "full_metrics": {target: {"rmse": 1.0} for target in TARGETS}}
+
+    with pytest.raises(ValueError, match="torch encoder"):
+        models.train_incremental()
+
+    assert backends == ["int8"]
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,98 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("lightgbm")
+
+from backend.model.parallel import fit_targets, FoldRunner
+from backend.model.cv import cross_validate
+
+
+def make_jobs(n_rows=400, n_features=12, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.standard_normal((n_rows, n_features)), columns=[f"f{i}" for i in range(n_features)])
+    X_train, X_test = X.iloc[:300], X.iloc[300:]
+    params = {"n_estimators": 30, "num_leaves": 7, "random_state": 42, "n_jobs": 1,
+              "deterministic": True, "force_col_wise": True, "verbose": -1}
+    jobs = {}
+    for i, target in enumerate(["views", "likes"]):
+        y = X.iloc[:, i] * 2 + rng.standard_normal(n_rows) * 0.1
+        jobs[target] = {"params": params, "y_train": y.iloc[:300], "y_test": y.iloc[300:]}
+    return jobs, X_train, X_test
+
+
+def test_process_pool_matches_sequential_fits(tmp_path):
+    jobs, X_train, X_test = make_jobs()
+    sequential = fit_targets(jobs, X_train, X_test, max_workers=1, directory=tmp_path)
+    parallel = fit_targets(jobs, X_train, X_test, max_workers=2, directory=tmp_path)
+
+    assert list(parallel) == ["views", "likes"]
+    for target in jobs:
+        model, seconds = parallel[target]
+        assert seconds > 0
+        assert model.booster_.feature_name() == X_train.columns.tolist()
+        np.testing.assert_array_equal(model.predict(X_test), sequential[target][0].predict(X_test))
+    # The memory-mapped matrices are removed after the pool finishes
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_warm_start_adds_trees_to_the_saved_booster():
+    from backend.model.train import Model
+
+    jobs, X_train, X_test = make_jobs()
+    job = jobs["views"]
+    model = Model(sentece_transformer=object())
+    model.model = fit_targets({"views": job}, X_train, X_test, max_workers=1, directory=None)["views"][0]
+    base_trees = model.model.booster_.current_iteration()
+    base_pred = model.model.predict(X_test)
+
+    model.train_incremental(X_test, job["y_test"], n_rounds=5)
+
+    assert model.model.booster_.current_iteration() == base_trees + 5
+    # The first trees are the saved booster, so its predictions are the starting point
+    np.testing.assert_allclose(model.model.predict(X_test, num_iteration=base_trees), base_pred)
+
+
+def test_cross_validation_prunes_clearly_worse_settings(tmp_path):
+    jobs, X_train, X_test = make_jobs()
+    X = pd.concat([X_train, X_test])
+    targets = {target: pd.concat([job["y_train"], job["y_test"]]) for target, job in jobs.items()}
+    base_params = {target: job["params"] for target, job in jobs.items()}
+    folds = [(np.setdiff1d(np.arange(len(X)), test), test) for test in np.array_split(np.arange(len(X)), 4)]
+    # A single shallow tree with a tiny learning rate barely moves from the mean
+    settings = [{}, {"n_estimators": 1, "learning_rate": 0.01}]
+
+    with FoldRunner(X, targets, max_workers=2, directory=tmp_path) as runner:
+        report = cross_validate(runner, folds, base_params, settings, prune_margin=0.05, min_folds=2)
+
+    good, bad = report["settings"]
+    assert report["best_setting"] == {}
+    assert good["pruned_after_folds"] is None
+    assert [fold["fold"] for fold in good["targets"]["views"]["folds"]] == [0, 1, 2, 3]
+    assert bad["pruned_after_folds"] == 2
+    assert len(bad["targets"]["likes"]["folds"]) == 2
+    assert good["targets"]["views"]["rmse_mean"] < bad["targets"]["views"]["rmse_mean"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_fold_fits_on_dataset_subsets_match_fits_on_copied_rows(tmp_path):
+    from backend.model import parallel
+    from backend.model.parallel import fit_booster
+
+    jobs, X_train, X_test = make_jobs()
+    X = pd.concat([X_train, X_test])
+    y = pd.concat([jobs["views"]["y_train"], jobs["views"]["y_test"]]).to_numpy()
+    test_idx = np.arange(0, len(X), 4)
+    train_idx = np.setdiff1d(np.arange(len(X)), test_idx)
+    params = jobs["views"]["params"]
+
+    with FoldRunner(X, {"views": y}, max_workers=1, directory=tmp_path) as runner:
+        result, = runner.run([{"key": 0, "params": params, "target": "views", "train_idx": train_idx, "test_idx": test_idx}])
+        assert len(parallel._FOLD_DATASETS) == 1
+
+    copied = fit_booster(params, X.iloc[train_idx], y[train_idx], X.iloc[test_idx], y[test_idx], X.columns.tolist())
+    copied_rmse = np.sqrt(np.mean((copied.predict(X.iloc[test_idx]) - y[test_idx]) ** 2))
+    # Bins come from all rows rather than the fold's training rows, so the fits are close, not identical
+    assert result["rmse"] == pytest.approx(copied_rmse, rel=0.1)
+    assert result["rmse"] < 0.5 * y.std()
+    assert parallel._FOLD_DATASETS == {}
@@ -0,0 +1,75 @@
+import random
+import re
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("matplotlib")
+pytest.importorskip("sklearn")
+
+from backend.model.utils import preprocess_text, preprocess_texts, stopwords
+
+
+def reference_preprocess_text(text):
+    """preprocess_text as it was before the single-pass normalizer."""
+    if text is None:
+        return ""
+    text = text.lower()
+    text = re.sub(r'\W', ' ', text)
+    text = re.sub(r'\d', ' ', text)
+    text = re.sub(r'\n', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    tokens = text.split()
+    tokens = [word for word in tokens if word not in stopwords]
+    text = ' '.join(tokens)
+    return text
+
+
+# Letters (ASCII, Danish, German, Turkish, Greek, CJK), digits of several scripts, underscores,
+# every kind of whitespace str.split() knows, punctuation, emoji and combining marks
+ALPHABET = (
+    "abcXYZ" "æøåÆØÅ" "ßẞİıÉé" "Σσς" "中文"
+    "0123456789" "٣²½" "_"
+    " \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f\x85\xa0 　"
+    ".,!?'\"#@-:/()" "🚀👍" "́"
+)
+WORDS = sorted(stopwords) + ["Launch", "THE", "don't", "it's", "x2", "2x", "a_b", "__", "ÅR", "HÅR"]
+
+
+def random_text(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(0, 12)):
+        if rng.random() < 0.5:
+            parts.append(rng.choice(WORDS))
+        else:
+            parts.append("".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 8))))
+        parts.append(rng.choice(["", " ", "  ", "\n", "\t", ",", "　"]))
+    return "".join(parts)
+
+
+def test_preprocess_text_matches_reference_on_random_texts():
+    rng = random.Random(1234)
+    for _ in range(5000):
+        text = random_text(rng)
+        assert preprocess_text(text) == reference_preprocess_text(text), repr(text)
+
+
+@pytest.mark.parametrize("text", [None, "", "   ", "123 !!!", "The THE the", "don't stop", "a1b2c3", "snake_case_2024"])
+def test_preprocess_text_edge_cases(text):
+    assert preprocess_text(text) == reference_preprocess_text(text)
+
+
+def test_preprocess_texts_list_and_series():
+    rng = random.Random(99)
+    texts = [random_text(rng) for _ in range(200)]
+    texts += texts[:50] + [None]
+    expected = [reference_preprocess_text(text) for text in texts]
+
+    assert preprocess_texts(texts) == expected
+
+    series = pd.Series(texts, index=range(100, 100 + len(texts)), name="text", dtype=object)
+    out = preprocess_texts(series)
+    assert isinstance(out, pd.Series)
+    assert out.index.equals(series.index)
+    assert out.name == "text"
+    assert out.tolist() == expected
@@ -0,0 +1,23 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+from backend.model.report import stratified_sample
+
+
+def test_stratified_sample_covers_every_target_decile():
+    rng = np.random.default_rng(0)
+    y = np.concatenate([rng.normal(3, 0.5, 9900), rng.normal(12, 0.5, 100)])
+    sample = stratified_sample(y, 50)
+
+    assert 45 <= len(sample) <= 60
+    assert len(np.unique(sample)) == len(sample)
+    assert np.all(np.diff(sample) > 0)
+    deciles = np.quantile(y, np.linspace(0, 1, 11))
+    assert len(np.unique(np.digitize(y[sample], deciles[1:-1]))) == 10
+    np.testing.assert_array_equal(stratified_sample(y, 50), sample)
+
+
+def test_stratified_sample_keeps_small_sets_whole():
+    np.testing.assert_array_equal(stratified_sample(np.arange(30.0), 100), np.arange(30))
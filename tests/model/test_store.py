@@ -0,0 +1,56 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.model.store import EmbeddingStore
+
+
+def test_store_encodes_only_new_texts_across_instances(tmp_path, fake_encoder):
+    store = EmbeddingStore(tmp_path, "all-MiniLM-L6-v2")
+    first = store.encode(fake_encoder, ["hello world", "shipping today", "hello world"])
+    assert sorted(fake_encoder.encoded) == ["hello world", "shipping today"]
+    assert len(store) == 2
+
+    fake_encoder.encoded.clear()
+    reopened = EmbeddingStore(tmp_path, "all-MiniLM-L6-v2")
+    second = reopened.encode(fake_encoder, ["shipping today", "new tweet", "hello world"])
+    assert fake_encoder.encoded == ["new tweet"]
+    assert len(reopened) == 3
+
+    np.testing.assert_array_equal(second[0], first[1])
+    np.testing.assert_array_equal(second[2], first[0])
+    np.testing.assert_array_equal(second, fake_encoder.encode(["shipping today", "new tweet", "hello world"]))
+    assert isinstance(np.load(reopened.vectors_path, mmap_mode="r"), np.memmap)
+
+
+def test_store_is_keyed_by_transformer(tmp_path, fake_encoder):
+    EmbeddingStore(tmp_path, "all-MiniLM-L6-v2").encode(fake_encoder, ["hello world"])
+    fake_encoder.encoded.clear()
+    other = EmbeddingStore(tmp_path, "sentence-transformers/all-mpnet-base-v2")
+    other.encode(fake_encoder, ["hello world"])
+    assert fake_encoder.encoded == ["hello world"]
+
+
+def test_store_ignores_rows_without_keys(tmp_path, fake_encoder):
+    store = EmbeddingStore(tmp_path, "model")
+    store.encode(fake_encoder, ["a", "b"])
+    # Simulate an append interrupted after the vectors file was replaced
+    vectors = np.load(store.vectors_path)
+    np.save(store.vectors_path, np.vstack([vectors, np.ones((1, vectors.shape[1]), dtype=np.float32)]))
+
+    reopened = EmbeddingStore(tmp_path, "model")
+    assert len(reopened) == 2
+    np.testing.assert_array_equal(reopened.encode(fake_encoder, ["b"]), vectors[1:2])
+
+
+def test_store_keeps_other_encoder_backends_apart(tmp_path, fake_encoder):
+    training = EmbeddingStore(tmp_path, "all-MiniLM-L6-v2")
+    training.encode(fake_encoder, ["hello world"])
+    fake_encoder.encoded.clear()
+
+    int8 = EmbeddingStore(tmp_path, "all-MiniLM-L6-v2", backend="int8")
+    int8.encode(fake_encoder, ["hello world", "shipping today"])
+
+    assert fake_encoder.encoded == ["hello world", "shipping today"]
+    assert int8.vectors_path != training.vectors_path
+    assert len(EmbeddingStore(tmp_path, "all-MiniLM-L6-v2")) == 1
@@ -0,0 +1,169 @@
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+pytest.importorskip("uvicorn")
+
+from backend.serve import check_fork_safety, memory_stats
+
+ROOT = Path(__file__).resolve().parents[2]
+
+APP = '''
+import os
+from fastapi import FastAPI
+
+app = FastAPI()
+LOADED_BY = os.getpid()
+LOADED_WITH_OMP = os.environ.get("OMP_NUM_THREADS")
+# Stands in for the models: built once in the master, shared by the workers
+PAYLOAD = bytearray(32 * 1024 * 1024)
+
+
+@app.get("/pid")
+def pid():
+    return {
+        "worker": os.getpid(),
+        "loaded_by": LOADED_BY,
+        "loaded_with_omp": LOADED_WITH_OMP,
+        "omp": os.environ.get("OMP_NUM_THREADS")
+    }
+'''
+
+
+MODELS_APP = '''
+import os
+
+from conftest import FakeEncoder
+from fastapi import FastAPI
+
+from backend.config import DATA_DIR
+from backend.model.budget import thread_budget
+from backend.model.models import Models
+from backend.model.train import Model
+
+# Loaded like Models.load in the master: multi-threaded budget, packed forest built and verified before fork
+PACKED = Models(["views", "likes", "retweets", "comments"])
+PACKED.models = {target: Model.load(DATA_DIR / f"model_{target}.pkl", sentece_transformer=FakeEncoder()) for target in PACKED.targets}
+PACKED.use_thread_budget(thread_budget(workers=1, cpus=4, jobs=1, threads_per_job=4))
+assert PACKED.use_packed_forest()
+LIGHTGBM = Models(PACKED.targets)
+LIGHTGBM.models = PACKED.models
+LIGHTGBM.thread_budget = PACKED.thread_budget
+LOADED_BY = os.getpid()
+app = FastAPI()
+
+
+@app.get("/forecast")
+def forecast():
+    tweets = [{"text": "shipping today", "author_followers_count": 1000, "is_blue_verified": 0}] * 64
+    return {
+        "worker": os.getpid(),
+        "loaded_by": LOADED_BY,
+        "packed": PACKED.predict_bulk(tweets, [1, 24])[0]["views"],
+        "lightgbm": LIGHTGBM.predict_bulk(tweets, [1, 24])[0]["views"]
+    }
+'''
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.skipif(not Path("/proc/self/smaps_rollup").exists(), reason="needs /proc/self/smaps_rollup")
+def test_memory_stats_reads_smaps_rollup():
+    stats = memory_stats()
+    assert 0 < stats["uss_mb"] <= stats["rss_mb"]
+    assert 0 < stats["pss_mb"] <= stats["rss_mb"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+@pytest.mark.parametrize("omp_num_threads", [None, "3"])
+def test_workers_are_forked_from_one_preloaded_app(tmp_path, omp_num_threads):
+    (tmp_path / "preloaded_app.py").write_text(APP)
+    port = free_port()
+    env = {key: value for key, value in os.environ.items() if key != "OMP_NUM_THREADS"}
+    env["PYTHONPATH"] = os.pathsep.join([str(tmp_path), str(ROOT)])
+    if omp_num_threads is not None:
+        env["OMP_NUM_THREADS"] = omp_num_threads
+    master = subprocess.Popen(
+        [sys.executable, "-c", f"from backend.serve import serve; serve('preloaded_app:app', workers=2, host='127.0.0.1', port={port})"],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    try:
+        responses = []
+        deadline = time.monotonic() + 60
+        while len(responses) < 20 and time.monotonic() < deadline:
+            try:
+                responses.append(httpx.get(f"http://127.0.0.1:{port}/pid", timeout=5).json())
+            except httpx.TransportError:
+                time.sleep(0.2)
+        assert len(responses) == 20
+        # Every worker serves the app object the master built
+        assert {response["loaded_by"] for response in responses} == {master.pid}
+        assert master.pid not in {response["worker"] for response in responses}
+        # The master loads single-threaded; workers get the environment's value back
+        assert {response["loaded_with_omp"] for response in responses} == {"1"}
+        assert {response["omp"] for response in responses} == {omp_num_threads}
+    finally:
+        master.send_signal(signal.SIGTERM)
+        output = master.communicate(timeout=30)[0]
+
+    assert master.returncode == 0
+    ready = re.findall(r"Worker (\d+) ready: \{'uss_mb': ([\d.]+)", output)
+    assert len(ready) == 2
+    # The 32 MB payload is shared copy-on-write, not copied into each worker
+    assert all(float(uss) < 32 for _, uss in ready)
+
+
+def test_fork_safety_refuses_onnx_and_warns_about_unpacked_forest(tmp_path, capsys):
+    check_fork_safety(1, encoder_backend="onnx")
+    with pytest.raises(ValueError):
+        check_fork_safety(2, encoder_backend="onnx-int8")
+
+    check_fork_safety(2, encoder_backend="torch", engine="packed", data_dir=tmp_path)
+    assert "models.bin" in capsys.readouterr().out
+    (tmp_path / "models.bin").touch()
+    check_fork_safety(2, encoder_backend="torch", engine="packed", data_dir=tmp_path)
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_workers_predict_with_models_loaded_in_the_master(tmp_path):
+    pytest.importorskip("lightgbm")
+    (tmp_path / "models_app.py").write_text(MODELS_APP)
+    port = free_port()
+    # tests/ for the shared FakeEncoder in conftest.py
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(tmp_path), str(ROOT), str(ROOT / "tests")])}
+    master = subprocess.Popen(
+        [sys.executable, "-c", f"from backend.serve import serve; serve('models_app:app', workers=2, host='127.0.0.1', port={port})"],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    try:
+        responses = []
+        deadline = time.monotonic() + 120
+        while len(responses) < 6 and time.monotonic() < deadline:
+            try:
+                # A worker hung on an inherited thread pool never answers
+                responses.append(httpx.get(f"http://127.0.0.1:{port}/forecast", timeout=30).json())
+            except httpx.ConnectError:
+                time.sleep(0.2)
+        assert len(responses) == 6
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.communicate(timeout=30)
+
+    assert {response["loaded_by"] for response in responses} == {master.pid}
+    assert master.pid not in {response["worker"] for response in responses}
+    for response in responses:
+        assert response["packed"] == pytest.approx(response["lightgbm"], rel=1e-9)